@@ -0,0 +1,107 @@
+import argparse
+import json
+import time
+
+from benchmarks.stats import latency_summary, print_table
+from camera.analysis import FrameAnalyzer, StageTimer
+from camera.frame_sources import open_frame_source, parse_frame_source_spec
+from camera.models import get_face_models, model_stats
+from camera.state_evaluator import DriverStateEvaluator
+from config import SETTINGS
+
+try:
+    import dlib
+except ImportError:
+    dlib = None
+
+
+def run_source(spec, detector, predictor, max_frames=None):
+    source = open_frame_source(spec, realtime=False)
+    if source is None:
+        return None
+    timer = StageTimer()
+    analyzer = FrameAnalyzer(detector, predictor, timer=timer)
+    evaluator = DriverStateEvaluator(seat=spec)
+    frame_times = []
+    started = time.perf_counter()
+    try:
+        for index, (_, gray, timestamp) in enumerate(source):
+            if max_frames is not None and index >= max_frames:
+                break
+            frame_started = time.perf_counter()
+            blink_duration = analyzer.process(gray, timestamp)
+            if blink_duration is not None:
+                evaluator.add_blink(timestamp, blink_duration)
+            evaluator.update(timestamp)
+            timer.mark("state")
+            frame_times.append(time.perf_counter() - frame_started)
+    finally:
+        source.close()
+    elapsed = time.perf_counter() - started
+
+    stages = {name: latency_summary(samples) for name, samples in timer.samples.items()}
+    stages["frame"] = latency_summary(frame_times)
+    return {
+        "source": spec,
+        "frames": len(frame_times),
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(len(frame_times) / elapsed, 2) if elapsed else 0.0,
+        "blinks": analyzer.total_blinks,
+        "state_transitions": evaluator.transitions,
+        "final_state": evaluator.state,
+        "stages": stages,
+    }
+
+
+def _source_spec(value):
+    try:
+        parse_frame_source_spec(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from None
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded drives through the driver monitor hot path.")
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        type=_source_spec,
+        help="Frame sources such as video:drive.mp4, images:frames/ or synthetic:300.",
+    )
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    if dlib is None:
+        print("dlib is required for the monitor benchmark.")
+        return 1
+    if not SETTINGS.shape_predictor_path.exists():
+        print(f"Missing shape predictor model: {SETTINGS.shape_predictor_path}")
+        return 1
+    models = get_face_models()
+    if models is None:
+        return 1
+    detector, predictor = models
+    print(f"Model load: {model_stats()['load_seconds']} s")
+
+    results = []
+    for spec in args.sources:
+        result = run_source(spec, detector, predictor, args.max_frames)
+        if result is None:
+            continue
+        results.append(result)
+        print_table(
+            f"{spec}: {result['frames']} frames, {result['fps']} fps, "
+            f"{result['blinks']} blinks, final state {result['final_state']}",
+            result["stages"],
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=4)
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.standins import FaultProfile, start_standins
+from benchmarks.stats import latency_summary, print_table
+
+
+DRIVER_STATES = ["Wakefulness", "Hypovigilance", "Drowsiness", "Microsleep"]
+
+
+def _configure_environment(servers, cache_dir, environment_service):
+    # Settings are read once on import, so this has to run before any project module is imported.
+    os.environ.update(
+        {
+            "OPENAI_API_KEY": "benchmark",
+            "OPENAI_BASE_URL": f"{servers['openai'].base_url}/v1",
+            "SPOTIFY_API_BASE_URL": f"{servers['spotify'].base_url}/v1/",
+            "OPENWEATHER_API_KEY": "benchmark",
+            "OPENWEATHER_BASE_URL": servers["openweather"].base_url,
+            "GEOAPIFY_API_KEY": "benchmark",
+            "GEOAPIFY_BASE_URL": servers["geoapify"].base_url,
+            "TOMTOM_API_KEY": "benchmark",
+            "TOMTOM_BASE_URL": servers["tomtom"].base_url,
+            "ARTIST_CACHE_PATH": os.path.join(cache_dir, "artist_genres.sqlite3"),
+            "DECISION_CACHE_PATH": os.path.join(cache_dir, "music_decisions.sqlite3"),
+            "TASTE_PROFILE_PATH": os.path.join(cache_dir, "taste_profiles.json"),
+            "TRACK_FEATURES_PATH": os.path.join(cache_dir, "track_features.sqlite3"),
+            "GEO_CACHE_PATH": os.path.join(cache_dir, "geo_tiles.sqlite3"),
+            "ENVIRONMENT_SERVICE_ENABLED": "true" if environment_service else "false",
+            "PLAYBACK_POLL_INTERVAL_SECONDS": "0.05",
+        }
+    )
+
+
+def _run_level(scenario, concurrency, iterations, sp, servers, quiet):
+    from spotify.playlist import create_smart_playlist, get_discovery_tracks
+    from spotify.taste_profile import get_taste_profile
+    from utils import state
+
+    def discovery(index):
+        user_genres = get_taste_profile(sp)["genres"]
+        return get_discovery_tracks(sp, DRIVER_STATES[index % len(DRIVER_STATES)], user_genres, max_tracks=60)
+
+    def create(index):
+        state.driver_state = DRIVER_STATES[index % len(DRIVER_STATES)]
+        return create_smart_playlist(sp)
+
+    task = discovery if scenario == "discovery" else create
+    durations = []
+    failures = 0
+
+    def timed(index):
+        started = time.perf_counter()
+        result = task(index)
+        return time.perf_counter() - started, result
+
+    for server in servers.values():
+        server.reset()
+    state.reset_playlist_state()
+    output = io.StringIO() if quiet else None
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(timed, index) for index in range(iterations)]:
+                try:
+                    duration, result = future.result()
+                except Exception:
+                    failures += 1
+                    continue
+                durations.append(duration)
+                if not result:
+                    failures += 1
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    calls = {}
+    statuses = {}
+    for name, server in servers.items():
+        for endpoint, samples in server.latencies.items():
+            endpoints[f"{name} {endpoint}"] = latency_summary(samples)
+            calls[f"{name} {endpoint}"] = server.calls[endpoint]
+        for status, count in server.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "iterations": iterations,
+        "failures": failures,
+        "wall_s": round(elapsed, 3),
+        "builds_per_s": round(len(durations) / elapsed, 3) if elapsed else 0.0,
+        "total_calls": sum(calls.values()),
+        "statuses": statuses,
+        "build": latency_summary(durations),
+        "calls": calls,
+        "endpoints": endpoints,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the playlist path against local stand-ins for every external API.")
+    parser.add_argument("--scenario", choices=["discovery", "create", "both"], default="both")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated worker counts.")
+    parser.add_argument("--iterations", type=int, default=8, help="Builds per concurrency level.")
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with a 429.")
+    parser.add_argument("--retry-after", type=int, default=0, help="Retry-After seconds sent with injected 429s.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--cold", action="store_true", help="Start every concurrency level with empty caches.")
+    parser.add_argument("--environment-service", action="store_true", help="Read lux, traffic and weather from the background service.")
+    parser.add_argument("--verbose", action="store_true", help="Keep the playlist code's own progress output.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    profile = FaultProfile(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, args.retry_after, args.seed)
+    servers = start_standins(profile)
+    cache_root = tempfile.TemporaryDirectory(prefix="playlist-benchmark-")
+    _configure_environment(servers, cache_root.name, args.environment_service)
+
+    from environment.service import environment
+    from spotify.auth import new_spotify_client
+
+    if args.environment_service:
+        environment.start()
+        time.sleep(0.5)
+
+    scenarios = ["discovery", "create"] if args.scenario == "both" else [args.scenario]
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    results = []
+    try:
+        for scenario in scenarios:
+            for concurrency in levels:
+                if args.cold:
+                    _reset_caches()
+                sp = new_spotify_client(auth="benchmark")
+                result = _run_level(scenario, concurrency, args.iterations, sp, servers, not args.verbose)
+                results.append(result)
+                print_table(
+                    f"{scenario} x{concurrency}: {result['iterations']} builds in {result['wall_s']} s, "
+                    f"{result['total_calls']} calls, {result['failures']} failures, statuses {result['statuses']}",
+                    {"build": result["build"], **result["endpoints"]},
+                )
+    finally:
+        environment.stop()
+        for server in servers.values():
+            server.stop()
+        cache_root.cleanup()
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=4)
+    return 0 if results else 1
+
+
+def _reset_caches():
+    from environment.geo_cache import reset_geo_cache
+    from spotify.artist_cache import reset_artist_cache
+    from spotify.decision_cache import reset_decision_cache
+    from spotify.feature_store import reset_feature_store
+    from spotify.genre_matcher import clear_matchers
+    from spotify.taste_profile import reset_taste_profile_cache
+
+    reset_artist_cache()
+    reset_decision_cache()
+    reset_feature_store()
+    reset_taste_profile_cache()
+    reset_geo_cache()
+    clear_matchers()
+    for path in ("ARTIST_CACHE_PATH", "DECISION_CACHE_PATH", "TASTE_PROFILE_PATH", "TRACK_FEATURES_PATH", "GEO_CACHE_PATH"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.environ[path])
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,317 @@
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+GENRES = ["k-pop", "k-rap", "melodic rap", "edm", "dance pop", "lo-fi", "indie rock", "ambient", "trap", "synthwave"]
+ARTIST_COUNT = 300
+
+
+class FaultProfile:
+    def __init__(self, latency_ms=30.0, jitter_ms=10.0, error_rate=0.0, rate_limit_rate=0.0, retry_after=0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return delay, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, 500
+        return delay, 200
+
+
+class StandInServer:
+    def __init__(self, name, routes, profile):
+        self.name = name
+        self.routes = [(method, re.compile(pattern), endpoint, handler) for method, pattern, endpoint, handler in routes]
+        self.profile = profile
+        self.calls = defaultdict(int)
+        self.statuses = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _dispatch(self):
+                standin.handle(self)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"standin-{self.name}", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.statuses.clear()
+            self.latencies.clear()
+
+    def handle(self, request):
+        started = time.perf_counter()
+        url = urlparse(request.path)
+        length = int(request.headers.get("Content-Length") or 0)
+        raw_body = request.rfile.read(length) if length else b""
+        for method, pattern, endpoint, handler in self.routes:
+            match = pattern.fullmatch(url.path)
+            if method == request.command and match:
+                break
+        else:
+            self._respond(request, f"{request.command} {url.path}", 404, {"error": "unknown endpoint"}, started)
+            return
+
+        delay, status = self.profile.draw()
+        time.sleep(delay)
+        if status == 429:
+            self._respond(request, endpoint, 429, {"error": {"status": 429, "message": "injected rate limit"}}, started)
+            return
+        if status == 500:
+            self._respond(request, endpoint, 500, {"error": {"status": 500, "message": "injected failure"}}, started)
+            return
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = json.loads(raw_body) if raw_body else None
+        self._respond(request, endpoint, 200, handler(match, query, body), started)
+
+    def _respond(self, request, endpoint, status, payload, started):
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            request.send_header("Retry-After", str(self.profile.retry_after))
+        request.end_headers()
+        request.wfile.write(data)
+        with self._lock:
+            self.calls[endpoint] += 1
+            self.statuses[status] += 1
+            self.latencies[endpoint].append(time.perf_counter() - started)
+
+
+def _stable(value, modulo):
+    return zlib.crc32(str(value).encode("utf-8")) % modulo
+
+
+def _artist(index):
+    return {"id": f"artist{index}", "name": f"Artist {index}", "type": "artist"}
+
+
+def _track(track_id):
+    artist_index = _stable(track_id, ARTIST_COUNT)
+    return {
+        "id": track_id,
+        "uri": f"spotify:track:{track_id}",
+        "name": f"Song {track_id}",
+        "artists": [_artist(artist_index)],
+        "album": {"name": f"Album {artist_index}", "images": [{"url": "http://127.0.0.1/cover.jpg"}] * 3},
+        "available_markets": ["BG", "DE", "US", "GB", "KR"] * 10,
+        "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+        "duration_ms": 180000 + _stable(track_id, 60000),
+        "popularity": _stable(track_id, 100),
+    }
+
+
+def _genres(artist_id):
+    index = _stable(artist_id, len(GENRES))
+    return [GENRES[index], GENRES[(index + 3) % len(GENRES)]]
+
+
+class SpotifyStandIn:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_playlist = 0
+        self.playing_context = None
+
+    def routes(self):
+        return [
+            ("GET", r"/v1/me/?", "me", self.me),
+            ("GET", r"/v1/me/top/tracks", "top tracks", self.top_tracks),
+            ("GET", r"/v1/me/top/artists", "top artists", self.top_artists),
+            ("GET", r"/v1/search", "search", self.search),
+            ("GET", r"/v1/playlists/([^/]+)/items", "playlist items", self.playlist_items),
+            ("POST", r"/v1/playlists/([^/]+)/items", "add items", self.snapshot),
+            ("PUT", r"/v1/playlists/([^/]+)/items", "replace items", self.snapshot),
+            ("DELETE", r"/v1/playlists/([^/]+)/items", "remove items", self.snapshot),
+            ("DELETE", r"/v1/playlists/([^/]+)/followers", "unfollow", self.empty),
+            ("POST", r"/v1/users/([^/]+)/playlists", "create playlist", self.create_playlist),
+            ("GET", r"/v1/artists/?", "artists", self.artists),
+            ("GET", r"/v1/recommendations", "recommendations", self.recommendations),
+            ("GET", r"/v1/audio-features/?", "audio features", self.audio_features),
+            ("GET", r"/v1/me/player/devices", "devices", self.devices),
+            ("PUT", r"/v1/me/player", "transfer", self.empty),
+            ("PUT", r"/v1/me/player/play", "play", self.play),
+            ("GET", r"/v1/me/player", "playback state", self.playback),
+        ]
+
+    def me(self, match, query, body):
+        return {"id": "bench-user", "display_name": "Benchmark"}
+
+    def top_tracks(self, match, query, body):
+        return {"items": [_track(f"top{index}") for index in range(int(query.get("limit", 20)))]}
+
+    def top_artists(self, match, query, body):
+        artists = []
+        for index in range(int(query.get("limit", 20))):
+            artist = _artist(index * 7 % ARTIST_COUNT)
+            artist["genres"] = _genres(artist["id"])
+            artists.append(artist)
+        return {"items": artists}
+
+    def search(self, match, query, body):
+        keyword = query.get("q", "")
+        limit = int(query.get("limit", 10))
+        return {"playlists": {"items": [{"id": f"pl{_stable(keyword, 10**6)}x{index}"} for index in range(limit)]}}
+
+    def playlist_items(self, match, query, body):
+        playlist_id = match.group(1)
+        limit = int(query.get("limit", 50))
+        tracks = [_track(f"{playlist_id}t{index}") for index in range(limit)]
+        if query.get("fields"):
+            tracks = [{key: track[key] for key in ("id", "uri", "name", "artists")} for track in tracks]
+        return {"items": [{"track": track} for track in tracks]}
+
+    def snapshot(self, match, query, body):
+        return {"snapshot_id": f"snap{time.monotonic_ns()}"}
+
+    def empty(self, match, query, body):
+        return None
+
+    def create_playlist(self, match, query, body):
+        with self._lock:
+            self._next_playlist += 1
+            return {"id": f"bench{self._next_playlist}", "name": (body or {}).get("name")}
+
+    def artists(self, match, query, body):
+        ids = [artist_id for artist_id in query.get("ids", "").split(",") if artist_id]
+        return {"artists": [{"id": artist_id, "name": artist_id, "genres": _genres(artist_id)} for artist_id in ids]}
+
+    def recommendations(self, match, query, body):
+        seed = query.get("seed_genres", "") + query.get("target_energy", "")
+        return {"tracks": [_track(f"rec{_stable(seed, 1000)}x{index}") for index in range(int(query.get("limit", 20)))]}
+
+    def audio_features(self, match, query, body):
+        features = []
+        for track_id in query.get("ids", "").split(","):
+            if track_id:
+                features.append(
+                    {
+                        "id": track_id,
+                        "energy": _stable(track_id + "e", 1000) / 1000,
+                        "valence": _stable(track_id + "v", 1000) / 1000,
+                        "tempo": 70 + _stable(track_id + "t", 110),
+                    }
+                )
+        return {"audio_features": features}
+
+    def devices(self, match, query, body):
+        return {"devices": [{"id": "bench-device", "type": "Computer", "is_active": True, "name": "Benchmark"}]}
+
+    def play(self, match, query, body):
+        self.playing_context = (body or {}).get("context_uri")
+        return None
+
+    def playback(self, match, query, body):
+        return {
+            "is_playing": self.playing_context is not None,
+            "context": {"uri": self.playing_context},
+            "item": _track("nowplaying"),
+        }
+
+
+def _openai_decision(match, query, body):
+    decision = {
+        "energy": 0.8,
+        "valence": 0.6,
+        "tempo_range_bpm": [115, 150],
+        "preferred_genres": ["k-pop", "edm", "dance pop"],
+        "avoid_genres": [],
+        "spotify_search_queries": ["upbeat k-pop", "dance k-pop", "driving edm", "rap bangers"],
+        "familiarity_bias": "balanced",
+        "vocal_preference": "mixed",
+    }
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": (body or {}).get("model", "bench"),
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(decision)},
+            }
+        ],
+        "usage": {"prompt_tokens": 400, "completion_tokens": 80, "total_tokens": 480},
+    }
+
+
+def _traffic(match, query, body):
+    return {"flowSegmentData": {"currentSpeed": 42, "freeFlowSpeed": 60}}
+
+
+def _reverse_geocode(match, query, body):
+    return {"features": [{"properties": {"city": "Sofia", "state": "Sofia City", "country": "Bulgaria", "street": "Bench"}}]}
+
+
+def _places(match, query, body):
+    return {"features": [{"properties": {"name": "South Park", "categories": ["poi.park"]}}]}
+
+
+def _weather(match, query, body):
+    return {"cod": 200, "main": {"temp": 14.2}, "weather": [{"main": "Clouds"}]}
+
+
+def start_standins(profile):
+    spotify = SpotifyStandIn()
+    servers = {
+        "spotify": StandInServer("spotify", spotify.routes(), profile),
+        "openai": StandInServer("openai", [("POST", r"/v1/chat/completions", "chat", _openai_decision)], profile),
+        "tomtom": StandInServer(
+            "tomtom",
+            [("GET", r"/traffic/services/4/flowSegmentData/absolute/10/json", "flow segment", _traffic)],
+            profile,
+        ),
+        "geoapify": StandInServer(
+            "geoapify",
+            [("GET", r"/v1/geocode/reverse", "reverse", _reverse_geocode), ("GET", r"/v2/places", "places", _places)],
+            profile,
+        ),
+        "openweather": StandInServer("openweather", [("GET", r"/data/2.5/weather", "weather", _weather)], profile),
+    }
+    for server in servers.values():
+        server.start()
+    return servers
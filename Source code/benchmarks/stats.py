@@ -0,0 +1,30 @@
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def latency_summary(samples):
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(ordered, 0.90) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def print_table(title, rows):
+    width = max([14] + [len(name) + 2 for name in rows])
+    print(title)
+    print(f"  {'stage':<{width}}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, summary in rows.items():
+        print(
+            f"  {name:<{width}}{summary['count']:>8}{summary['p50_ms']:>10.3f}"
+            f"{summary['p90_ms']:>10.3f}{summary['p99_ms']:>10.3f}{summary['max_ms']:>10.3f}"
+        )
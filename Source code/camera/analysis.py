@@ -0,0 +1,78 @@
+import time
+from collections import defaultdict
+
+from camera.face_detection import eye_aspect_ratios, new_eye_buffer, shape_to_eye_array
+from camera.face_tracking import FaceTracker
+from config import EYE_AR_THRESH, SETTINGS
+
+
+class _NullTimer:
+    def start(self):
+        pass
+
+    def mark(self, stage):
+        pass
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._last = None
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.samples[stage].append(now - self._last)
+        self._last = now
+
+
+class FrameAnalyzer:
+    def __init__(self, detector, predictor, timer=None):
+        self.predictor = predictor
+        self.face_tracker = FaceTracker(
+            detector,
+            detect_interval=SETTINGS.face_detect_interval,
+            roi_padding=SETTINGS.face_roi_padding,
+            min_confidence=SETTINGS.face_track_min_confidence,
+        )
+        self.timer = timer or _NullTimer()
+        self.total_blinks = 0
+        self.ear = None
+        self._eye_buffer = new_eye_buffer()
+        self._blink_start_time = None
+
+    def process(self, gray, timestamp):
+        timer = self.timer
+        timer.start()
+        face_rect = self.face_tracker.locate(gray)
+        timer.mark("detection")
+        blink_duration = None
+
+        if face_rect is None:
+            self.ear = None
+        else:
+            shape = self.predictor(gray, face_rect)
+            shape_to_eye_array(shape, self._eye_buffer)
+            timer.mark("landmarks")
+            left_ear, right_ear = eye_aspect_ratios(self._eye_buffer)
+            self.ear = (left_ear + right_ear) / 2.0
+            timer.mark("ear")
+            blink_duration = self._update_blink(self.ear, timestamp)
+            timer.mark("blinks")
+        return blink_duration
+
+    def _update_blink(self, ear, timestamp):
+        if ear < EYE_AR_THRESH:
+            if self._blink_start_time is None:
+                self._blink_start_time = timestamp
+            return None
+        if self._blink_start_time is None:
+            return None
+        duration = timestamp - self._blink_start_time
+        self._blink_start_time = None
+        if not 0.05 < duration < 2.0:
+            return None
+        self.total_blinks += 1
+        return duration
@@ -1,10 +1,16 @@
+import threading
 import time
 
-from camera.face_detection import LEFT_EYE, RIGHT_EYE, eye_aspect_ratio, shape_to_points
-from camera.pycam import close_picam2, start_picam2
-from config import EYE_AR_THRESH, SETTINGS
+from camera.analysis import FrameAnalyzer
+from camera.frame_sources import open_frame_source
+from camera.models import get_face_models
+from camera.pipeline import FrameGrabber, LatestFrameQueue, PipelineStats
+from camera.preview import annotate_frame, preview
+from camera.state_evaluator import UNKNOWN_STATE, DriverStateEvaluator, subscribe
+from camera.supervisor import MonitorSupervisor, parse_camera_specs
+from config import SETTINGS
 from spotify.auth import get_spotify_client
-from spotify.playlist import create_smart_playlist
+from spotify.playlist import create_smart_playlist, prefetch_candidate_pools
 from utils import state
 from utils.json_utils import update_json
 
@@ -19,19 +25,138 @@ except ImportError:
     dlib = None
 
 
-def _evaluate_driver_state(blink_timestamps, blink_durations, monitoring_duration):
-    blink_frequency = (len(blink_timestamps) / monitoring_duration) * 60
-    average_blink_duration = sum(blink_durations) / len(blink_durations) if blink_durations else 0.0
-    if blink_frequency <= 5:
-        return "Wakefulness"
-    if 6 <= blink_frequency <= 10:
-        return "Hypovigilance"
-    if average_blink_duration >= 0.5 or blink_frequency > 20:
-        return "Microsleep"
-    return "Drowsiness"
+def multi_camera_mode():
+    return bool(parse_camera_specs(SETTINGS.monitor_cameras))
 
 
-def monitor_driver():
+def _lores_size():
+    return SETTINGS.camera_lores_size if SETTINGS.camera_lores_enabled else None
+
+
+def _build_playlist():
+    if state.stop_event.is_set():
+        return
+    if state.playlist_created and not SETTINGS.playlist_follow_state:
+        return
+    spotify_client = get_spotify_client()
+    if not spotify_client:
+        return
+    create_smart_playlist(spotify_client, total_tracks=SETTINGS.total_tracks)
+    if not SETTINGS.playlist_follow_state:
+        state.monitoring_active = False
+
+
+class _PlaylistUpdates:
+    # Builds run off the frame loop; transitions that arrive mid-build collapse into one follow-up build.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requested = False
+        self._running = False
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def request(self):
+        with self._lock:
+            self._requested = True
+            if self._running:
+                return
+            self._running = True
+            self._idle.clear()
+        threading.Thread(target=self._run, name="playlist-update", daemon=True).start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._requested or state.stop_event.is_set():
+                    self._requested = False
+                    self._running = False
+                    self._idle.set()
+                    return
+                self._requested = False
+            try:
+                _build_playlist()
+            except Exception as error:
+                print(f"Playlist update failed: {error}")
+
+    def wait(self, timeout=None):
+        return self._idle.wait(timeout)
+
+
+playlist_updates = _PlaylistUpdates()
+
+
+def _apply_driver_state(driver_state):
+    state.driver_state = driver_state
+    update_json()
+    if state.playlist_created and not SETTINGS.playlist_follow_state:
+        return
+    playlist_updates.request()
+
+
+class _PrefetchHints:
+    def __init__(self):
+        self._next_at = None
+        self._last_frequency = None
+
+    def update(self, evaluator, now):
+        if not SETTINGS.prefetch_enabled or evaluator.estimate is None:
+            return
+        if state.playlist_created and not SETTINGS.playlist_follow_state:
+            return
+        if self._next_at is not None and now < self._next_at:
+            return
+        self._next_at = now + SETTINGS.prefetch_interval_seconds
+        previous, self._last_frequency = self._last_frequency, evaluator.blink_frequency
+        blink_trend = 0.0 if previous is None else evaluator.blink_frequency - previous
+        spotify_client = get_spotify_client()
+        if spotify_client:
+            prefetch_candidate_pools(spotify_client, evaluator.estimate, blink_trend)
+
+
+def _on_transition(primary_seat):
+    def handle(transition):
+        state.seat_states[transition.seat] = transition.current
+        if transition.seat == primary_seat:
+            _apply_driver_state(transition.current)
+
+    return handle
+
+
+def _monitor_cameras(camera_specs):
+    supervisor = MonitorSupervisor(camera_specs, lores_size=_lores_size())
+    if not supervisor.start():
+        print("No monitoring cameras could be started.")
+        state.monitoring_active = False
+        state.monitoring_thread = None
+        return
+    state.monitor_supervisor = supervisor
+    state.seat_states.clear()
+    state.driver_state = "Wakefulness"
+    primary_seat = supervisor.seats[0]
+    prefetch_hints = _PrefetchHints()
+    unsubscribe = subscribe(_on_transition(primary_seat))
+    try:
+        while state.monitoring_active and not state.stop_event.is_set():
+            supervisor.poll(timeout=0.5)
+            for seat in supervisor.failed_seats:
+                state.seat_states[seat] = UNKNOWN_STATE
+            if primary_seat in supervisor.failed_seats:
+                print(f"Driver monitoring stopped: no camera is analysing seat {primary_seat}.")
+                state.driver_state = UNKNOWN_STATE
+                update_json()
+                state.monitoring_active = False
+                break
+            now = time.time()
+            supervisor.update(now)
+            prefetch_hints.update(supervisor.evaluators[primary_seat], now)
+    finally:
+        unsubscribe()
+        supervisor.stop()
+        state.monitor_supervisor = None
+        state.monitoring_thread = None
+
+
+def monitor_driver(source=None):
     if cv2 is None or dlib is None:
         print("OpenCV and dlib are required for driver monitoring.")
         state.monitoring_active = False
@@ -40,76 +165,89 @@ def monitor_driver():
         print(f"Missing shape predictor model: {SETTINGS.shape_predictor_path}")
         state.monitoring_active = False
         return
+    camera_specs = parse_camera_specs(SETTINGS.monitor_cameras)
+    if source is None and camera_specs:
+        # Frames stay in the camera processes' shared rings, so there is nothing to annotate for /preview.
+        _monitor_cameras(camera_specs)
+        return
 
-    detector = dlib.get_frontal_face_detector()
-    predictor = dlib.shape_predictor(str(SETTINGS.shape_predictor_path))
-    camera = start_picam2()
-    if camera is None:
-        print("Picamera2 is unavailable.")
+    models = get_face_models()
+    if models is None:
+        print("Face models could not be loaded.")
+        state.monitoring_active = False
+        return
+    detector, predictor = models
+    analyzer = FrameAnalyzer(detector, predictor)
+    evaluator = DriverStateEvaluator()
+    prefetch_hints = _PrefetchHints()
+    source = source or open_frame_source(SETTINGS.frame_source, lores_size=_lores_size())
+    if source is None:
+        print("No frame source is available.")
         state.monitoring_active = False
         return
 
     state.driver_state = "Wakefulness"
-    start_time = time.time()
-    blink_timestamps = []
-    blink_durations = []
-    blink_start_time = None
+    unsubscribe = subscribe(_on_transition(evaluator.seat))
 
-    cv2.destroyAllWindows()
-    cv2.namedWindow("Driver Monitor", cv2.WINDOW_NORMAL)
+    stats = PipelineStats()
+    state.pipeline_stats = stats
+    frames = None
+    grabber = None
+    if SETTINGS.camera_pipeline:
+        frames = LatestFrameQueue()
+        grabber = FrameGrabber(source, frames, stats)
+        grabber.start()
+
+    preview.open()
+    if not SETTINGS.monitor_headless:
+        cv2.destroyAllWindows()
+        cv2.namedWindow("Driver Monitor", cv2.WINDOW_NORMAL)
 
     try:
         while state.monitoring_active and not state.stop_event.is_set():
-            frame = camera.capture_array()
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            rects = detector(gray, 0)
-            now = time.time()
-            ear = 0.0
-
-            if rects:
-                shape = predictor(gray, rects[0])
-                points = shape_to_points(shape)
-                left_ear = eye_aspect_ratio([points[index] for index in LEFT_EYE])
-                right_ear = eye_aspect_ratio([points[index] for index in RIGHT_EYE])
-                ear = (left_ear + right_ear) / 2.0
-                if ear < EYE_AR_THRESH:
-                    if blink_start_time is None:
-                        blink_start_time = now
-                elif blink_start_time is not None:
-                    duration = now - blink_start_time
-                    if 0.05 < duration < 2.0:
-                        blink_timestamps.append(now)
-                        blink_durations.append(duration)
-                    blink_start_time = None
-
-            blink_timestamps = [timestamp for timestamp in blink_timestamps if now - timestamp <= 60]
-
-            if now - start_time >= SETTINGS.monitoring_duration_seconds:
-                blink_count = len(blink_timestamps)
-                recent_blink_durations = blink_durations[-blink_count:] if blink_count else []
-                state.driver_state = _evaluate_driver_state(
-                    blink_timestamps,
-                    recent_blink_durations,
-                    SETTINGS.monitoring_duration_seconds,
-                )
-                update_json()
-                if not state.playlist_created:
-                    spotify_client = get_spotify_client()
-                    if spotify_client:
-                        create_smart_playlist(spotify_client, total_tracks=SETTINGS.total_tracks)
-                        state.monitoring_active = False
+            if frames is not None:
+                item = frames.get(timeout=1.0)
+                if item is None:
+                    if frames.closed:
                         break
-                start_time = now
+                    continue
+                frame, gray, now, captured_at = item
+            else:
+                item = source.read()
+                if item is None:
+                    break
+                frame, gray, now = item
+                captured_at = time.time()
+                stats.record_capture(False)
 
-            cv2.putText(frame, f"State: {state.driver_state}", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            cv2.imshow("Driver Monitor", frame)
-            if cv2.waitKey(1) & 0xFF == 27:
-                state.monitoring_active = False
+            blink_duration = analyzer.process(gray, now)
+            if blink_duration is not None:
+                evaluator.add_blink(now, blink_duration)
+            evaluator.update(now)
+            if not state.monitoring_active:
                 break
+            prefetch_hints.update(evaluator, now)
+
+            stats.record_latency(time.time() - captured_at)
+            publish_preview = preview.wants_frame(now)
+            if publish_preview or not SETTINGS.monitor_headless:
+                annotate_frame(frame, state.driver_state)
+            if publish_preview:
+                preview.publish(frame, now)
+            if not SETTINGS.monitor_headless:
+                cv2.imshow("Driver Monitor", frame)
+                if cv2.waitKey(1) & 0xFF == 27:
+                    state.monitoring_active = False
+                    break
     finally:
-        close_picam2()
-        try:
-            cv2.destroyAllWindows()
-        except Exception:
-            pass
+        unsubscribe()
+        if grabber is not None:
+            grabber.stop()
+        preview.close()
+        source.close()
+        if not SETTINGS.monitor_headless:
+            try:
+                cv2.destroyAllWindows()
+            except Exception:
+                pass
         state.monitoring_thread = None
@@ -1,9 +1,54 @@
 from config import LEFT_EYE, RIGHT_EYE
-from utils.math_utils import eye_aspect_ratio
+from utils.math_utils import eye_aspect_ratio, eye_aspect_ratios
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+EYE_POINTS = LEFT_EYE + RIGHT_EYE
 
 
 def shape_to_points(shape):
     return [(shape.part(index).x, shape.part(index).y) for index in range(68)]
 
 
-__all__ = ["LEFT_EYE", "RIGHT_EYE", "eye_aspect_ratio", "shape_to_points"]
+def new_eye_buffer():
+    return np.empty((2, len(LEFT_EYE), 2), dtype=np.float64)
+
+
+def shape_to_eye_array(shape, out=None):
+    if out is None:
+        out = new_eye_buffer()
+    flat = out.reshape(-1, 2)
+    for row, index in enumerate(EYE_POINTS):
+        point = shape.part(index)
+        flat[row, 0] = point.x
+        flat[row, 1] = point.y
+    return out
+
+
+def batch_eye_aspect_ratio(landmarks):
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    if landmarks.shape[-2] == 68:
+        eyes = landmarks[..., EYE_POINTS, :]
+    elif landmarks.shape[-2] == len(EYE_POINTS):
+        eyes = landmarks
+    else:
+        raise ValueError(f"Expected 68 or {len(EYE_POINTS)} landmarks per frame, got {landmarks.shape[-2]}")
+    eyes = eyes.reshape(eyes.shape[:-2] + (2, len(LEFT_EYE), 2))
+    return eye_aspect_ratios(eyes).mean(axis=-1)
+
+
+__all__ = [
+    "EYE_POINTS",
+    "LEFT_EYE",
+    "RIGHT_EYE",
+    "batch_eye_aspect_ratio",
+    "eye_aspect_ratio",
+    "eye_aspect_ratios",
+    "new_eye_buffer",
+    "shape_to_eye_array",
+    "shape_to_points",
+]
@@ -0,0 +1,88 @@
+try:
+    import dlib
+except ImportError:
+    dlib = None
+
+
+class FaceTracker:
+    def __init__(self, detector, detect_interval=5, roi_padding=0.5, min_confidence=7.0):
+        self.detector = detector
+        self.detect_interval = max(1, int(detect_interval))
+        self.roi_padding = max(0.0, float(roi_padding))
+        self.min_confidence = min_confidence
+        self._tracker = None
+        self._rect = None
+        self._frames_since_detection = 0
+
+    def reset(self):
+        self._tracker = None
+        self._rect = None
+        self._frames_since_detection = 0
+
+    def locate(self, gray):
+        if self._rect is None:
+            rect = self._detect_full(gray)
+        else:
+            self._frames_since_detection += 1
+            rect = None
+            if self._frames_since_detection < self.detect_interval:
+                rect = self._track(gray)
+            if rect is None:
+                rect = self._detect_roi(gray) or self._detect_full(gray)
+
+        if rect is None:
+            self.reset()
+            return None
+        if rect is not self._rect:
+            self._start_tracking(gray, rect)
+        return rect
+
+    def _start_tracking(self, gray, rect):
+        self._rect = rect
+        self._frames_since_detection = 0
+        if self.detect_interval == 1:
+            self._tracker = None
+            return
+        self._tracker = dlib.correlation_tracker()
+        self._tracker.start_track(gray, rect)
+
+    def _track(self, gray):
+        if self._tracker is None:
+            return None
+        confidence = self._tracker.update(gray)
+        if confidence < self.min_confidence:
+            return None
+        position = self._tracker.get_position()
+        height, width = gray.shape[:2]
+        rect = dlib.rectangle(
+            max(0, int(position.left())),
+            max(0, int(position.top())),
+            min(width - 1, int(position.right())),
+            min(height - 1, int(position.bottom())),
+        )
+        if rect.is_empty():
+            return None
+        self._rect = rect
+        return rect
+
+    def _detect_full(self, gray):
+        rects = self.detector(gray, 0)
+        return rects[0] if rects else None
+
+    def _detect_roi(self, gray):
+        if self._rect is None or self.roi_padding <= 0:
+            return None
+        height, width = gray.shape[:2]
+        pad_x = int(self._rect.width() * self.roi_padding)
+        pad_y = int(self._rect.height() * self.roi_padding)
+        left = max(0, self._rect.left() - pad_x)
+        top = max(0, self._rect.top() - pad_y)
+        right = min(width, self._rect.right() + pad_x + 1)
+        bottom = min(height, self._rect.bottom() + pad_y + 1)
+        if right - left >= width and bottom - top >= height:
+            return None
+        rects = self.detector(gray[top:bottom, left:right].copy(), 0)
+        if not rects:
+            return None
+        rect = rects[0]
+        return dlib.rectangle(rect.left() + left, rect.top() + top, rect.right() + left, rect.bottom() + top)
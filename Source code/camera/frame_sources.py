@@ -0,0 +1,200 @@
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from camera.pycam import capture_lores_gray, release_picam2, start_picam2
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+SOURCE_KINDS = ("picamera", "video", "images", "synthetic")
+
+
+class FrameSource(ABC):
+    def open(self):
+        return True
+
+    @abstractmethod
+    def read(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        while True:
+            item = self.read()
+            if item is None:
+                return
+            yield item
+
+
+class PicameraSource(FrameSource):
+    def __init__(self, lores_size=None, camera_num=0):
+        self.lores_size = lores_size
+        self.camera_num = camera_num
+        self.camera = None
+
+    def open(self):
+        self.camera = start_picam2(self.lores_size, self.camera_num)
+        return self.camera is not None
+
+    def read(self):
+        if self.lores_size:
+            gray = capture_lores_gray(self.camera, self.lores_size)
+            return gray, gray, time.time()
+        frame = self.camera.capture_array()
+        return frame, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), time.time()
+
+    def close(self):
+        release_picam2(self.camera_num)
+        self.camera = None
+
+
+class _PacedSource(FrameSource):
+    def __init__(self, fps, realtime):
+        self.fps = fps
+        self.realtime = realtime
+        self._index = 0
+        self._started_at = None
+
+    def _timestamp(self):
+        if self._started_at is None:
+            self._started_at = time.time()
+        offset = self._index / self.fps
+        self._index += 1
+        if self.realtime:
+            delay = self._started_at + offset - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        return self._started_at + offset
+
+
+class VideoFileSource(_PacedSource):
+    def __init__(self, path, realtime=True, loop=False):
+        super().__init__(fps=30.0, realtime=realtime)
+        self.path = Path(path)
+        self.loop = loop
+        self._capture = None
+
+    def open(self):
+        if cv2 is None or not self.path.exists():
+            return False
+        self._capture = cv2.VideoCapture(str(self.path))
+        if not self._capture.isOpened():
+            return False
+        self.fps = self._capture.get(cv2.CAP_PROP_FPS) or self.fps
+        return True
+
+    def read(self):
+        ok, frame = self._capture.read()
+        if not ok and self.loop:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._capture.read()
+        if not ok:
+            return None
+        return frame, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), self._timestamp()
+
+    def close(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+
+class ImageDirectorySource(_PacedSource):
+    def __init__(self, path, fps=15.0, realtime=True, loop=False):
+        super().__init__(fps=fps, realtime=realtime)
+        self.path = Path(path)
+        self.loop = loop
+        self._files = []
+        self._position = 0
+
+    def open(self):
+        if cv2 is None or not self.path.is_dir():
+            return False
+        self._files = sorted(file for file in self.path.iterdir() if file.suffix.lower() in IMAGE_SUFFIXES)
+        return bool(self._files)
+
+    def read(self):
+        while True:
+            if self._position >= len(self._files):
+                if not self.loop:
+                    return None
+                self._position = 0
+            file = self._files[self._position]
+            self._position += 1
+            frame = cv2.imread(str(file))
+            if frame is not None:
+                return frame, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), self._timestamp()
+
+
+class SyntheticSource(_PacedSource):
+    def __init__(self, size=(640, 480), fps=30.0, frames=300, realtime=False, seed=0):
+        super().__init__(fps=fps, realtime=realtime)
+        self.size = size
+        self.frames = frames
+        self.seed = seed
+        self._pool = []
+
+    def open(self):
+        if np is None:
+            return False
+        width, height = self.size
+        rng = np.random.default_rng(self.seed)
+        self._pool = [rng.integers(0, 256, (height, width), dtype=np.uint8) for _ in range(8)]
+        return True
+
+    def read(self):
+        if self.frames is not None and self._index >= self.frames:
+            return None
+        gray = self._pool[self._index % len(self._pool)]
+        return gray, gray, self._timestamp()
+
+
+def parse_frame_source_spec(spec):
+    kind, _, argument = spec.partition(":")
+    kind = kind.strip().lower()
+    argument = argument.strip()
+    if kind not in SOURCE_KINDS:
+        raise ValueError(f"invalid frame source {spec!r}: expected one of {', '.join(SOURCE_KINDS)}")
+    if kind in ("picamera", "synthetic"):
+        if not argument:
+            return kind, 0 if kind == "picamera" else 300
+        try:
+            return kind, int(argument)
+        except ValueError:
+            label = "camera number" if kind == "picamera" else "frame count"
+            raise ValueError(f"invalid frame source {spec!r}: {label} must be an integer, got {argument!r}") from None
+    if not argument:
+        raise ValueError(f"invalid frame source {spec!r}: a path is required")
+    return kind, argument
+
+
+def open_frame_source(spec, realtime=True, lores_size=None):
+    try:
+        kind, argument = parse_frame_source_spec(spec)
+    except ValueError as error:
+        print(error)
+        return None
+    if kind == "picamera":
+        source = PicameraSource(lores_size, argument)
+    elif kind == "video":
+        source = VideoFileSource(argument, realtime=realtime)
+    elif kind == "images":
+        source = ImageDirectorySource(argument, realtime=realtime)
+    else:
+        source = SyntheticSource(frames=argument, realtime=realtime)
+    if not source.open():
+        print(f"Could not open frame source: {spec}")
+        source.close()
+        return None
+    return source
@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+
+from config import SETTINGS
+
+try:
+    import dlib
+except ImportError:
+    dlib = None
+
+
+_lock = threading.Lock()
+_models = None
+_preload_thread = None
+_stats = {
+    "loaded": False,
+    "load_seconds": None,
+    "model_file_bytes": None,
+    "rss_delta_bytes": None,
+    "error": None,
+}
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def models_available():
+    return dlib is not None and SETTINGS.shape_predictor_path.exists()
+
+
+def _load_models():
+    started = time.perf_counter()
+    rss_before = _rss_bytes()
+    detector = dlib.get_frontal_face_detector()
+    predictor = dlib.shape_predictor(str(SETTINGS.shape_predictor_path))
+    rss_after = _rss_bytes()
+    _stats.update(
+        {
+            "loaded": True,
+            "load_seconds": round(time.perf_counter() - started, 3),
+            "model_file_bytes": SETTINGS.shape_predictor_path.stat().st_size,
+            "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            "error": None,
+        }
+    )
+    print(f"Face models loaded: {_stats}")
+    return detector, predictor
+
+
+def get_face_models():
+    global _models
+    if _models is not None:
+        return _models
+    if not models_available():
+        return None
+    with _lock:
+        if _models is None:
+            try:
+                _models = _load_models()
+            except Exception as error:
+                _stats["error"] = str(error)
+                print(f"Could not load face models: {error}")
+                return None
+    return _models
+
+
+def preload_face_models():
+    global _preload_thread
+    if _models is not None or not models_available():
+        return None
+    if _preload_thread is None or not _preload_thread.is_alive():
+        _preload_thread = threading.Thread(target=get_face_models, name="face-model-preload", daemon=True)
+        _preload_thread.start()
+    return _preload_thread
+
+
+def model_stats():
+    return dict(_stats)
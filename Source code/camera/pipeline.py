@@ -0,0 +1,92 @@
+import threading
+import time
+
+
+class PipelineStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_processed = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record_capture(self, dropped):
+        with self._lock:
+            self.frames_captured += 1
+            if dropped:
+                self.frames_dropped += 1
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self.frames_processed += 1
+            self.latency_total += seconds
+            self.latency_max = max(self.latency_max, seconds)
+
+    def summary(self):
+        with self._lock:
+            average = self.latency_total / self.frames_processed if self.frames_processed else 0.0
+            return {
+                "frames_captured": self.frames_captured,
+                "frames_dropped": self.frames_dropped,
+                "frames_processed": self.frames_processed,
+                "latency_avg_ms": round(average * 1000, 2),
+                "latency_max_ms": round(self.latency_max * 1000, 2),
+            }
+
+
+class LatestFrameQueue:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._closed = False
+
+    def put(self, item):
+        with self._condition:
+            dropped = self._item is not None
+            self._item = item
+            self._condition.notify()
+            return dropped
+
+    def get(self, timeout=None):
+        with self._condition:
+            self._condition.wait_for(lambda: self._item is not None or self._closed, timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class FrameGrabber(threading.Thread):
+    def __init__(self, source, frames, stats):
+        super().__init__(name="frame-grabber", daemon=True)
+        self.source = source
+        self.frames = frames
+        self.stats = stats
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                item = self.source.read()
+                if item is None:
+                    break
+                dropped = self.frames.put(item + (time.time(),))
+                self.stats.record_capture(dropped)
+        except Exception as error:
+            if not self._stop_event.is_set():
+                print(f"Frame capture error: {error}")
+        finally:
+            self.frames.close()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=timeout)
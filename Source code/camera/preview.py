@@ -0,0 +1,94 @@
+import threading
+
+from config import SETTINGS
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+BOUNDARY = "frame"
+
+
+class PreviewBroadcaster:
+    def __init__(self, max_fps=5.0):
+        self.max_fps = max_fps
+        self._condition = threading.Condition()
+        self._clients = 0
+        self._live = False
+        self._frame = None
+        self._jpeg = None
+        self._sequence = 0
+        self._last_published = 0.0
+
+    @property
+    def available(self):
+        return cv2 is not None
+
+    @property
+    def has_clients(self):
+        return self._clients > 0
+
+    def open(self):
+        with self._condition:
+            self._live = True
+            self._frame = None
+            self._jpeg = None
+
+    def close(self):
+        with self._condition:
+            self._live = False
+            self._frame = None
+            self._jpeg = None
+            self._condition.notify_all()
+
+    def wants_frame(self, now):
+        if not self._clients:
+            return False
+        return self.max_fps <= 0 or now - self._last_published >= 1.0 / self.max_fps
+
+    def publish(self, frame, now):
+        with self._condition:
+            self._frame = frame
+            self._jpeg = None
+            self._sequence += 1
+            self._last_published = now
+            self._condition.notify_all()
+
+    def stream(self):
+        with self._condition:
+            self._clients += 1
+        try:
+            sequence = self._sequence
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._sequence != sequence or not self._live, timeout=1.0)
+                    if not self._live:
+                        return
+                    if self._sequence == sequence:
+                        continue
+                    sequence = self._sequence
+                    jpeg = self._encode_locked()
+                if jpeg is not None:
+                    yield b"--" + BOUNDARY.encode() + b"\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n"
+        finally:
+            with self._condition:
+                self._clients -= 1
+
+    def _encode_locked(self):
+        if self._jpeg is None and self._frame is not None:
+            ok, encoded = cv2.imencode(".jpg", self._frame)
+            if ok:
+                self._jpeg = encoded.tobytes()
+            self._frame = None
+        return self._jpeg
+
+
+def annotate_frame(frame, driver_state):
+    color = 255 if frame.ndim == 2 else (0, 0, 255)
+    cv2.putText(frame, f"State: {driver_state}", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+    return frame
+
+
+preview = PreviewBroadcaster(SETTINGS.preview_max_fps)
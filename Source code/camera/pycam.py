@@ -1,35 +1,155 @@
+import atexit
+import threading
 import time
 
+from config import SETTINGS
 from utils import state
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 try:
     from picamera2 import Picamera2
 except ImportError:
     Picamera2 = None
 
 
-def close_picam2():
-    if state.picam2 is None:
+_lock = threading.RLock()
+_lores_sizes = {}
+_idle_timers = {}
+
+
+def _frame_duration_us(fps):
+    return int(1_000_000 / fps)
+
+
+def _set_frame_rate(camera, fps):
+    if fps <= 0:
         return
+    duration = _frame_duration_us(fps)
     try:
-        state.picam2.stop()
-    except Exception:
-        pass
-    try:
-        state.picam2.close()
-    except Exception:
-        pass
-    state.picam2 = None
+        camera.set_controls({"FrameDurationLimits": (duration, duration)})
+    except Exception as error:
+        print(f"Could not set camera frame rate: {error}")
+
+
+def _cancel_idle_timer(camera_num):
+    timer = _idle_timers.pop(camera_num, None)
+    if timer is not None:
+        timer.cancel()
+
+
+def _close_if_idle(camera_num):
+    with _lock:
+        # cancel() cannot stop a callback that already started; a camera handed back meanwhile has another or no timer.
+        if _idle_timers.get(camera_num) is not threading.current_thread():
+            return
+        close_picam2(camera_num)
+
+
+def _wait_until_ready(camera, timeout):
+    ready = threading.Event()
+
+    def wait_for_frame():
+        try:
+            camera.capture_metadata()
+        except Exception:
+            return
+        ready.set()
 
+    threading.Thread(target=wait_for_frame, name="camera-ready", daemon=True).start()
+    if not ready.wait(timeout):
+        print(f"Camera did not deliver a frame within {timeout} s.")
 
-def start_picam2():
+
+def close_picam2(camera_num=None):
+    with _lock:
+        camera_nums = list(state.cameras) if camera_num is None else [camera_num]
+        for number in camera_nums:
+            _cancel_idle_timer(number)
+            _lores_sizes.pop(number, None)
+            camera = state.cameras.pop(number, None)
+            if camera is None:
+                continue
+            try:
+                camera.stop()
+            except Exception:
+                pass
+            try:
+                camera.close()
+            except Exception:
+                pass
+
+
+def start_picam2(lores_size=None, camera_num=0):
     if Picamera2 is None:
         return None
-    close_picam2()
-    camera = Picamera2()
-    config = camera.create_preview_configuration(main={"size": (640, 480), "format": "RGB888"})
-    camera.configure(config)
-    camera.start()
-    time.sleep(1)
-    state.picam2 = camera
+    started = time.perf_counter()
+    with _lock:
+        _cancel_idle_timer(camera_num)
+        camera = state.cameras.get(camera_num)
+        if camera is not None and _lores_sizes.get(camera_num) == lores_size:
+            _set_frame_rate(camera, SETTINGS.camera_fps)
+        else:
+            close_picam2(camera_num)
+            camera = Picamera2(camera_num)
+            lores = {"size": lores_size, "format": "YUV420"} if lores_size else None
+            controls = {}
+            if SETTINGS.camera_fps > 0:
+                duration = _frame_duration_us(SETTINGS.camera_fps)
+                controls["FrameDurationLimits"] = (duration, duration)
+            config = camera.create_preview_configuration(
+                main={"size": (640, 480), "format": "RGB888"},
+                lores=lores,
+                controls=controls,
+            )
+            camera.configure(config)
+            camera.start()
+            _wait_until_ready(camera, SETTINGS.camera_ready_timeout_seconds)
+            state.cameras[camera_num] = camera
+            _lores_sizes[camera_num] = lores_size
+    print(f"Camera {camera_num} ready in {time.perf_counter() - started:.3f} s")
     return camera
+
+
+def release_picam2(camera_num=0):
+    if not SETTINGS.camera_keep_warm:
+        close_picam2(camera_num)
+        return
+    with _lock:
+        camera = state.cameras.get(camera_num)
+        if camera is None:
+            return
+        _set_frame_rate(camera, SETTINGS.camera_idle_fps)
+        _cancel_idle_timer(camera_num)
+        if SETTINGS.camera_idle_timeout_seconds > 0:
+            timer = threading.Timer(SETTINGS.camera_idle_timeout_seconds, _close_if_idle, args=(camera_num,))
+            timer.daemon = True
+            _idle_timers[camera_num] = timer
+            timer.start()
+
+
+def prewarm_picam2(lores_size=None, camera_num=0):
+    if Picamera2 is None or not SETTINGS.camera_keep_warm:
+        return None
+
+    def warm():
+        try:
+            if start_picam2(lores_size, camera_num) is not None:
+                release_picam2(camera_num)
+        except Exception as error:
+            print(f"Could not warm up camera {camera_num}: {error}")
+
+    thread = threading.Thread(target=warm, name=f"camera-warmup-{camera_num}", daemon=True)
+    thread.start()
+    return thread
+
+
+def capture_lores_gray(camera, lores_size):
+    width, height = lores_size
+    return np.ascontiguousarray(camera.capture_array("lores")[:height, :width])
+
+
+atexit.register(close_picam2)
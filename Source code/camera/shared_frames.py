@@ -0,0 +1,112 @@
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+FREE, WRITING, READY, READING = 0, 1, 2, 3
+
+
+class SharedFrameRing:
+    def __init__(self, shape, slots, context):
+        self.shape = tuple(shape)
+        self.slots = max(3, int(slots))
+        self.states = context.Array("b", self.slots, lock=False)
+        self.sequences = context.Array("q", self.slots, lock=False)
+        self.timestamps = context.Array("d", self.slots * 2, lock=False)
+        self.dropped = context.Value("q", 0, lock=False)
+        self.closed = context.Value("b", 0, lock=False)
+        self.condition = context.Condition()
+        frame_size = int(np.prod(self.shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=frame_size * self.slots)
+        self._owner = True
+        self._sequence = 0
+        self._frames = self._map_frames()
+
+    def __getstate__(self):
+        data = self.__dict__.copy()
+        data["_shm"] = self._shm.name
+        data["_frames"] = None
+        return data
+
+    def __setstate__(self, data):
+        self.__dict__.update(data)
+        self._shm = shared_memory.SharedMemory(name=data["_shm"])
+        self._owner = False
+        self._frames = self._map_frames()
+
+    def _map_frames(self):
+        return np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=self._shm.buf)
+
+    @property
+    def is_closed(self):
+        return bool(self.closed.value)
+
+    def write(self, gray, timestamp, captured_at):
+        if gray.shape != self.shape:
+            return False
+        with self.condition:
+            slot = self._claim_write_slot()
+            if slot is None:
+                return False
+            self.states[slot] = WRITING
+        np.copyto(self._frames[slot], gray)
+        with self.condition:
+            self._sequence += 1
+            self.sequences[slot] = self._sequence
+            self.timestamps[slot * 2] = timestamp
+            self.timestamps[slot * 2 + 1] = captured_at
+            self.states[slot] = READY
+            self.condition.notify()
+        return True
+
+    def _claim_write_slot(self):
+        oldest = None
+        for slot in range(self.slots):
+            if self.states[slot] == FREE:
+                return slot
+            if self.states[slot] == READY and (oldest is None or self.sequences[slot] < self.sequences[oldest]):
+                oldest = slot
+        if oldest is not None:
+            self.dropped.value += 1
+        return oldest
+
+    def read(self, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: self.closed.value or READY in self.states[:], timeout)
+            ready = [slot for slot in range(self.slots) if self.states[slot] == READY]
+            if not ready:
+                return None
+            newest = max(ready, key=lambda slot: self.sequences[slot])
+            for slot in ready:
+                if slot != newest:
+                    self.states[slot] = FREE
+                    self.dropped.value += 1
+            self.states[newest] = READING
+        return newest, self._frames[newest], self.timestamps[newest * 2], self.timestamps[newest * 2 + 1]
+
+    def release(self, slot):
+        with self.condition:
+            self.states[slot] = FREE
+
+    def reclaim(self):
+        with self.condition:
+            for slot in range(self.slots):
+                if self.states[slot] in (WRITING, READING):
+                    self.states[slot] = FREE
+
+    def close(self):
+        with self.condition:
+            self.closed.value = 1
+            self.condition.notify_all()
+
+    def dispose(self):
+        self._frames = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
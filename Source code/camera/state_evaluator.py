@@ -0,0 +1,100 @@
+import threading
+from collections import namedtuple
+
+from config import SETTINGS
+from utils.blink_window import BlinkWindow
+
+
+DEFAULT_SEAT = "driver"
+UNKNOWN_STATE = "Unknown"
+
+DriverStateTransition = namedtuple(
+    "DriverStateTransition",
+    ["seat", "previous", "current", "timestamp", "blink_frequency", "mean_blink_duration"],
+)
+
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def subscribe(callback):
+    with _listeners_lock:
+        _listeners.append(callback)
+
+    def unsubscribe():
+        with _listeners_lock:
+            if callback in _listeners:
+                _listeners.remove(callback)
+
+    return unsubscribe
+
+
+def _publish(transition):
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for callback in listeners:
+        try:
+            callback(transition)
+        except Exception as error:
+            print(f"Driver state listener failed: {error}")
+
+
+def classify_driver_state(blink_frequency, average_blink_duration):
+    if blink_frequency < 6:
+        return "Wakefulness"
+    if blink_frequency <= 10:
+        return "Hypovigilance"
+    if average_blink_duration >= 0.5 or blink_frequency > 20:
+        return "Microsleep"
+    return "Drowsiness"
+
+
+class DriverStateEvaluator:
+    def __init__(self, seat=DEFAULT_SEAT, warmup_seconds=None, hold_seconds=None):
+        self.seat = seat
+        self.blink_window = BlinkWindow(SETTINGS.blink_window_seconds, SETTINGS.blink_window_capacity)
+        self.warmup_seconds = SETTINGS.monitoring_duration_seconds if warmup_seconds is None else warmup_seconds
+        self.hold_seconds = SETTINGS.state_hold_seconds if hold_seconds is None else hold_seconds
+        self.state = None
+        self.estimate = None
+        self.blink_frequency = 0.0
+        self.transitions = 0
+        self._started_at = None
+        self._candidate = None
+        self._candidate_since = None
+
+    def add_blink(self, timestamp, duration):
+        self.blink_window.add(timestamp, duration)
+
+    def update(self, now):
+        if self._started_at is None:
+            self._started_at = now
+        elapsed = now - self._started_at
+        window = self.blink_window
+        window.expire(now)
+        observed = min(elapsed, window.window_seconds)
+        blink_frequency = window.count / observed * 60 if observed > 0 else 0.0
+        mean_duration = window.mean_duration
+        candidate = classify_driver_state(blink_frequency, mean_duration)
+        self.blink_frequency = blink_frequency
+        self.estimate = candidate
+        if elapsed < self.warmup_seconds:
+            return None
+
+        if candidate == self.state:
+            self._candidate = None
+            return None
+        if self.state is not None:
+            if candidate != self._candidate:
+                self._candidate = candidate
+                self._candidate_since = now
+                return None
+            if now - self._candidate_since < self.hold_seconds:
+                return None
+
+        transition = DriverStateTransition(self.seat, self.state, candidate, now, blink_frequency, mean_duration)
+        self.state = candidate
+        self._candidate = None
+        self.transitions += 1
+        _publish(transition)
+        return transition
@@ -0,0 +1,235 @@
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+
+from camera.analysis import FrameAnalyzer
+from camera.frame_sources import open_frame_source
+from camera.models import get_face_models
+from camera.shared_frames import SharedFrameRing
+from camera.state_evaluator import DEFAULT_SEAT, DriverStateEvaluator
+from config import SETTINGS
+
+
+def parse_camera_specs(value):
+    specs = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        seat, separator, source = entry.partition("=")
+        if not separator:
+            seat, source = DEFAULT_SEAT, entry
+        specs.append((seat.strip() or DEFAULT_SEAT, source.strip()))
+    return specs
+
+
+def _analysis_worker(camera_id, ring, results, stop_event):
+    models = get_face_models()
+    if models is None:
+        ring.dispose()
+        return
+    analyzer = FrameAnalyzer(*models)
+    face_visible = None
+    processed = 0
+    latency_total = 0.0
+    gray = None
+    try:
+        while not stop_event.is_set():
+            item = ring.read(timeout=0.5)
+            if item is None:
+                if ring.is_closed:
+                    break
+                continue
+            slot, gray, timestamp, captured_at = item
+            try:
+                blink_duration = analyzer.process(gray, timestamp)
+            finally:
+                ring.release(slot)
+            processed += 1
+            latency_total += time.time() - captured_at
+            if blink_duration is not None:
+                results.put(("blink", camera_id, timestamp, blink_duration))
+            visible = analyzer.ear is not None
+            if visible != face_visible:
+                face_visible = visible
+                results.put(("face", camera_id, timestamp, visible))
+            if processed % 100 == 0:
+                results.put(("stats", camera_id, processed, latency_total / processed))
+    finally:
+        item = gray = None
+        ring.dispose()
+
+
+class BlinkStreamMerger:
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self._recent = {}
+
+    def accept(self, seat, timestamp):
+        recent = self._recent.setdefault(seat, deque(maxlen=8))
+        if any(abs(timestamp - accepted) <= self.tolerance for accepted in recent):
+            return False
+        recent.append(timestamp)
+        return True
+
+
+class _CameraFeed(threading.Thread):
+    def __init__(self, camera_id, seat, source, ring, worker, first_item):
+        super().__init__(name=f"camera-feed-{camera_id}", daemon=True)
+        self.camera_id = camera_id
+        self.seat = seat
+        self.source = source
+        self.ring = ring
+        self.worker = worker
+        self.restarts = 0
+        self.failed = False
+        self.frames_captured = 0
+        self._pending = first_item
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                item, self._pending = self._pending or self.source.read(), None
+                if item is None:
+                    break
+                _, gray, timestamp = item
+                if self.ring.write(gray, timestamp, time.time()):
+                    self.frames_captured += 1
+        except Exception as error:
+            if not self._stop_event.is_set():
+                print(f"Camera {self.camera_id} capture error: {error}")
+        finally:
+            self.ring.close()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+
+class MonitorSupervisor:
+    def __init__(self, camera_specs, lores_size=None):
+        self.camera_specs = camera_specs
+        self.lores_size = lores_size
+        self._context = multiprocessing.get_context("spawn")
+        self.results = self._context.Queue()
+        self.stop_event = self._context.Event()
+        self.merger = BlinkStreamMerger(SETTINGS.blink_merge_tolerance)
+        self.evaluators = {}
+        self.feeds = []
+        self.face_visible = {}
+        self.worker_stats = {}
+        self.failed_seats = set()
+
+    @property
+    def seats(self):
+        return list(dict.fromkeys(feed.seat for feed in self.feeds))
+
+    def start(self):
+        for index, (seat, spec) in enumerate(self.camera_specs):
+            camera_id = f"{seat}:{index}"
+            source = open_frame_source(spec, lores_size=self.lores_size)
+            if source is None:
+                continue
+            first_item = source.read()
+            if first_item is None:
+                source.close()
+                continue
+            ring = SharedFrameRing(first_item[1].shape, SETTINGS.frame_ring_slots, self._context)
+            worker = self._start_worker(camera_id, ring)
+            feed = _CameraFeed(camera_id, seat, source, ring, worker, first_item)
+            feed.start()
+            self.feeds.append(feed)
+            self.evaluators.setdefault(seat, DriverStateEvaluator(seat))
+        return bool(self.feeds)
+
+    def _start_worker(self, camera_id, ring):
+        worker = self._context.Process(
+            target=_analysis_worker,
+            args=(camera_id, ring, self.results, self.stop_event),
+            name=f"monitor-worker-{camera_id}",
+            daemon=True,
+        )
+        worker.start()
+        return worker
+
+    def check_workers(self):
+        for feed in self.feeds:
+            if feed.failed or feed.worker.is_alive() or feed.ring.is_closed or self.stop_event.is_set():
+                continue
+            print(f"Analysis worker for camera {feed.camera_id} exited with code {feed.worker.exitcode}.")
+            if feed.restarts < SETTINGS.monitor_worker_restarts:
+                feed.restarts += 1
+                feed.ring.reclaim()
+                feed.worker = self._start_worker(feed.camera_id, feed.ring)
+                print(f"Restarted analysis worker for camera {feed.camera_id} ({feed.restarts}/{SETTINGS.monitor_worker_restarts}).")
+                continue
+            feed.failed = True
+            feed.stop()
+            self.face_visible.pop(feed.camera_id, None)
+        for seat in self.seats:
+            if seat not in self.failed_seats and all(feed.failed for feed in self.feeds if feed.seat == seat):
+                self.failed_seats.add(seat)
+                print(f"No analysis worker is left for seat {seat}; its driver state is unknown.")
+        return self.failed_seats
+
+    def poll(self, timeout=0.5):
+        self.check_workers()
+        seats = {feed.camera_id: feed.seat for feed in self.feeds}
+        merged = 0
+        try:
+            event = self.results.get(timeout=timeout)
+        except queue.Empty:
+            return merged
+        while event is not None:
+            kind, camera_id = event[0], event[1]
+            if kind == "blink":
+                seat = seats[camera_id]
+                if self.merger.accept(seat, event[2]):
+                    self.evaluators[seat].add_blink(event[2], event[3])
+                    merged += 1
+            elif kind == "face":
+                self.face_visible[camera_id] = event[3]
+            elif kind == "stats":
+                self.worker_stats[camera_id] = {"frames_processed": event[2], "latency_avg_s": event[3]}
+            try:
+                event = self.results.get_nowait()
+            except queue.Empty:
+                event = None
+        return merged
+
+    def stats(self):
+        cameras = {}
+        for feed in self.feeds:
+            cameras[feed.camera_id] = {
+                "seat": feed.seat,
+                "frames_captured": feed.frames_captured,
+                "frames_dropped": feed.ring.dropped.value,
+                "worker_alive": feed.worker.is_alive(),
+                "restarts": feed.restarts,
+                "failed": feed.failed,
+                "face_visible": self.face_visible.get(feed.camera_id),
+                **self.worker_stats.get(feed.camera_id, {}),
+            }
+        return cameras
+
+    def update(self, now):
+        for seat, evaluator in self.evaluators.items():
+            if seat not in self.failed_seats:
+                evaluator.update(now)
+
+    def stop(self):
+        self.stop_event.set()
+        for feed in self.feeds:
+            feed.stop()
+        for feed in self.feeds:
+            feed.worker.join(timeout=5)
+            if feed.worker.is_alive():
+                feed.worker.terminate()
+            feed.source.close()
+            feed.ring.dispose()
+        self.results.close()
+        self.feeds = []
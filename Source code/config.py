@@ -54,6 +54,13 @@ def _resolve_path(value: str) -> Path:
     return BASE_DIR / path
 
 
+def _optional_path(name: str, default: str) -> Path | None:
+    value = os.getenv(name, default).strip()
+    if not value:
+        return None
+    return _resolve_path(value)
+
+
 _load_env_file(REPO_DIR / ".env")
 
 
@@ -74,22 +81,91 @@ class Settings:
     flask_debug: bool
     openai_api_key: str
     openai_model: str
+    openai_base_url: str
     spotify_client_id: str
     spotify_client_secret: str
     spotify_redirect_uri: str
+    spotify_api_base_url: str
+    spotify_request_timeout_seconds: float
+    spotify_http_retries: int
+    spotify_backoff_factor: float
+    spotify_pool_size: int
+    spotify_token_refresh_margin_seconds: float
     openweather_api_key: str
     geoapify_api_key: str
     tomtom_api_key: str
+    openweather_base_url: str
+    geoapify_base_url: str
+    tomtom_base_url: str
     default_city: str
     default_country_code: str
     default_latitude: float
     default_longitude: float
     simulated_speed_kmh: float
     default_lux: float
+    environment_service_enabled: bool
+    environment_max_age_seconds: float
+    lux_interval_seconds: float
+    lux_samples: int
+    traffic_interval_seconds: float
+    weather_interval_seconds: float
+    surroundings_interval_seconds: float
+    geo_cache_path: Path | None
+    geo_cache_precision: int
+    geo_cache_ttl_seconds: float
+    geo_cache_max_entries: int
+    geo_reverse_reuse_meters: float
     total_tracks: int
+    playlist_update_mode: str
+    playlist_follow_state: bool
+    playback_confirm_timeout_seconds: float
+    playback_poll_interval_seconds: float
+    context_budget_seconds: float
+    prefetch_enabled: bool
+    prefetch_max_pools: int
+    prefetch_ttl_seconds: float
+    prefetch_interval_seconds: float
+    discovery_workers: int
+    discovery_request_budget: int
+    discovery_call_timeout_seconds: float
+    discovery_deadline_seconds: float
+    artist_cache_path: Path
+    artist_cache_ttl_seconds: float
+    artist_cache_max_entries: int
+    taste_profile_path: Path | None
+    taste_profile_ttl_seconds: float
+    track_features_path: Path
+    track_features_seed_file: Path | None
+    track_features_fetch: bool
+    decision_cache_path: Path | None
+    decision_cache_ttl_seconds: float
+    decision_cache_stale_seconds: float
+    decision_cache_max_entries: int
     monitoring_duration_seconds: int
     combined_data_file: Path
     shape_predictor_path: Path
+    preload_face_models: bool
+    face_detect_interval: int
+    face_roi_padding: float
+    face_track_min_confidence: float
+    blink_window_seconds: float
+    blink_window_capacity: int
+    state_hold_seconds: float
+    frame_source: str
+    camera_fps: float
+    camera_keep_warm: bool
+    camera_idle_fps: float
+    camera_idle_timeout_seconds: float
+    camera_ready_timeout_seconds: float
+    camera_pipeline: bool
+    camera_lores_enabled: bool
+    camera_lores_size: tuple[int, int]
+    monitor_headless: bool
+    monitor_cameras: str
+    frame_ring_slots: int
+    blink_merge_tolerance: float
+    monitor_worker_restarts: int
+    preview_max_fps: float
 
 
 SETTINGS = Settings(
@@ -97,22 +173,91 @@ SETTINGS = Settings(
     flask_debug=_env_bool("FLASK_DEBUG", False),
     openai_api_key=os.getenv("OPENAI_API_KEY", ""),
     openai_model=os.getenv("OPENAI_MODEL", "gpt-4.1"),
+    openai_base_url=os.getenv("OPENAI_BASE_URL", ""),
     spotify_client_id=os.getenv("SPOTIFY_CLIENT_ID", ""),
     spotify_client_secret=os.getenv("SPOTIFY_CLIENT_SECRET", ""),
     spotify_redirect_uri=os.getenv("SPOTIFY_REDIRECT_URI", "http://127.0.0.1:5000/callback"),
+    spotify_api_base_url=os.getenv("SPOTIFY_API_BASE_URL", "https://api.spotify.com/v1/"),
+    spotify_request_timeout_seconds=_env_float("SPOTIFY_REQUEST_TIMEOUT_SECONDS", 10.0),
+    spotify_http_retries=_env_int("SPOTIFY_HTTP_RETRIES", 3),
+    spotify_backoff_factor=_env_float("SPOTIFY_BACKOFF_FACTOR", 0.5),
+    spotify_pool_size=_env_int("SPOTIFY_POOL_SIZE", 16),
+    spotify_token_refresh_margin_seconds=_env_float("SPOTIFY_TOKEN_REFRESH_MARGIN_SECONDS", 60.0),
     openweather_api_key=os.getenv("OPENWEATHER_API_KEY", ""),
     geoapify_api_key=os.getenv("GEOAPIFY_API_KEY", ""),
     tomtom_api_key=os.getenv("TOMTOM_API_KEY", ""),
+    openweather_base_url=os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org").rstrip("/"),
+    geoapify_base_url=os.getenv("GEOAPIFY_BASE_URL", "https://api.geoapify.com").rstrip("/"),
+    tomtom_base_url=os.getenv("TOMTOM_BASE_URL", "https://api.tomtom.com").rstrip("/"),
     default_city=os.getenv("DEFAULT_CITY", "Sofia"),
     default_country_code=os.getenv("DEFAULT_COUNTRY_CODE", "BG"),
     default_latitude=_env_float("DEFAULT_LATITUDE", 42.6977),
     default_longitude=_env_float("DEFAULT_LONGITUDE", 23.3219),
     simulated_speed_kmh=_env_float("SIMULATED_SPEED_KMH", 0.0),
     default_lux=_env_float("DEFAULT_LUX", 300.0),
+    environment_service_enabled=_env_bool("ENVIRONMENT_SERVICE_ENABLED", True),
+    environment_max_age_seconds=_env_float("ENVIRONMENT_MAX_AGE_SECONDS", 900.0),
+    lux_interval_seconds=_env_float("LUX_INTERVAL_SECONDS", 2.0),
+    lux_samples=_env_int("LUX_SAMPLES", 5),
+    traffic_interval_seconds=_env_float("TRAFFIC_INTERVAL_SECONDS", 120.0),
+    weather_interval_seconds=_env_float("WEATHER_INTERVAL_SECONDS", 300.0),
+    surroundings_interval_seconds=_env_float("SURROUNDINGS_INTERVAL_SECONDS", 900.0),
+    geo_cache_path=_optional_path("GEO_CACHE_PATH", "cache/geo_tiles.sqlite3"),
+    geo_cache_precision=_env_int("GEO_CACHE_PRECISION", 7),
+    geo_cache_ttl_seconds=_env_float("GEO_CACHE_TTL_SECONDS", 7 * 24 * 3600),
+    geo_cache_max_entries=_env_int("GEO_CACHE_MAX_ENTRIES", 5000),
+    geo_reverse_reuse_meters=_env_float("GEO_REVERSE_REUSE_METERS", 150.0),
     total_tracks=_env_int("TOTAL_TRACKS", 40),
+    playlist_update_mode=os.getenv("PLAYLIST_UPDATE_MODE", "diff").strip().lower(),
+    playlist_follow_state=_env_bool("PLAYLIST_FOLLOW_STATE", False),
+    playback_confirm_timeout_seconds=_env_float("PLAYBACK_CONFIRM_TIMEOUT_SECONDS", 5.0),
+    playback_poll_interval_seconds=_env_float("PLAYBACK_POLL_INTERVAL_SECONDS", 0.25),
+    context_budget_seconds=_env_float("CONTEXT_BUDGET_SECONDS", 6.0),
+    prefetch_enabled=_env_bool("PREFETCH_ENABLED", True),
+    prefetch_max_pools=_env_int("PREFETCH_MAX_POOLS", 2),
+    prefetch_ttl_seconds=_env_float("PREFETCH_TTL_SECONDS", 300.0),
+    prefetch_interval_seconds=_env_float("PREFETCH_INTERVAL_SECONDS", 10.0),
+    discovery_workers=_env_int("DISCOVERY_WORKERS", 8),
+    discovery_request_budget=_env_int("DISCOVERY_REQUEST_BUDGET", 60),
+    discovery_call_timeout_seconds=_env_float("DISCOVERY_CALL_TIMEOUT_SECONDS", 5.0),
+    discovery_deadline_seconds=_env_float("DISCOVERY_DEADLINE_SECONDS", 12.0),
+    artist_cache_path=_resolve_path(os.getenv("ARTIST_CACHE_PATH", "cache/artist_genres.sqlite3")),
+    artist_cache_ttl_seconds=_env_float("ARTIST_CACHE_TTL_SECONDS", 7 * 24 * 3600),
+    artist_cache_max_entries=_env_int("ARTIST_CACHE_MAX_ENTRIES", 20000),
+    taste_profile_path=_optional_path("TASTE_PROFILE_PATH", "cache/taste_profiles.json"),
+    taste_profile_ttl_seconds=_env_float("TASTE_PROFILE_TTL_SECONDS", 6 * 3600),
+    track_features_path=_resolve_path(os.getenv("TRACK_FEATURES_PATH", "cache/track_features.sqlite3")),
+    track_features_seed_file=_optional_path("TRACK_FEATURES_SEED_FILE", ""),
+    track_features_fetch=_env_bool("TRACK_FEATURES_FETCH", False),
+    decision_cache_path=_optional_path("DECISION_CACHE_PATH", "cache/music_decisions.sqlite3"),
+    decision_cache_ttl_seconds=_env_float("DECISION_CACHE_TTL_SECONDS", 1800.0),
+    decision_cache_stale_seconds=_env_float("DECISION_CACHE_STALE_SECONDS", 6 * 3600),
+    decision_cache_max_entries=_env_int("DECISION_CACHE_MAX_ENTRIES", 256),
     monitoring_duration_seconds=_env_int("MONITORING_DURATION_SECONDS", 30),
     combined_data_file=_resolve_path(os.getenv("COMBINED_DATA_FILE", "combined_data.json")),
     shape_predictor_path=_resolve_path(
         os.getenv("SHAPE_PREDICTOR_PATH", "models/shape_predictor_68_face_landmarks.dat")
     ),
+    preload_face_models=_env_bool("PRELOAD_FACE_MODELS", True),
+    face_detect_interval=_env_int("FACE_DETECT_INTERVAL", 5),
+    face_roi_padding=_env_float("FACE_ROI_PADDING", 0.5),
+    face_track_min_confidence=_env_float("FACE_TRACK_MIN_CONFIDENCE", 7.0),
+    blink_window_seconds=_env_float("BLINK_WINDOW_SECONDS", 60.0),
+    blink_window_capacity=_env_int("BLINK_WINDOW_CAPACITY", 512),
+    state_hold_seconds=_env_float("STATE_HOLD_SECONDS", 3.0),
+    frame_source=os.getenv("FRAME_SOURCE", "picamera"),
+    camera_fps=_env_float("CAMERA_FPS", 30.0),
+    camera_keep_warm=_env_bool("CAMERA_KEEP_WARM", True),
+    camera_idle_fps=_env_float("CAMERA_IDLE_FPS", 5.0),
+    camera_idle_timeout_seconds=_env_float("CAMERA_IDLE_TIMEOUT_SECONDS", 600.0),
+    camera_ready_timeout_seconds=_env_float("CAMERA_READY_TIMEOUT_SECONDS", 2.0),
+    camera_pipeline=_env_bool("CAMERA_PIPELINE", True),
+    camera_lores_enabled=_env_bool("CAMERA_LORES_ENABLED", False),
+    camera_lores_size=(_env_int("CAMERA_LORES_WIDTH", 320), _env_int("CAMERA_LORES_HEIGHT", 240)),
+    monitor_headless=_env_bool("MONITOR_HEADLESS", False),
+    monitor_cameras=os.getenv("MONITOR_CAMERAS", ""),
+    frame_ring_slots=_env_int("FRAME_RING_SLOTS", 3),
+    blink_merge_tolerance=_env_float("BLINK_MERGE_TOLERANCE", 0.15),
+    monitor_worker_restarts=_env_int("MONITOR_WORKER_RESTARTS", 2),
+    preview_max_fps=_env_float("PREVIEW_MAX_FPS", 5.0),
 )
@@ -0,0 +1,172 @@
+import json
+import math
+import sqlite3
+import threading
+import time
+
+from config import SETTINGS
+
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_EARTH_RADIUS_METERS = 6371000.0
+_METERS_PER_DEGREE = math.pi * _EARTH_RADIUS_METERS / 180.0
+
+
+def geohash_encode(lat, lon, precision):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        value, bounds = (lon, lon_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            bounds[0] = middle
+        else:
+            bits *= 2
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(geohash)
+
+
+def geohash_cell_size(precision):
+    lat_bits = precision * 5 // 2
+    lon_bits = precision * 5 - lat_bits
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def geohash_with_neighbours(lat, lon, precision):
+    cell_lat, cell_lon = geohash_cell_size(precision)
+    tiles = []
+    for lat_step in (0, -1, 1):
+        neighbour_lat = lat + lat_step * cell_lat
+        if not -90.0 <= neighbour_lat <= 90.0:
+            continue
+        for lon_step in (0, -1, 1):
+            neighbour_lon = (lon + lon_step * cell_lon + 180.0) % 360.0 - 180.0
+            tiles.append(geohash_encode(neighbour_lat, neighbour_lon, precision))
+    return list(dict.fromkeys(tiles))
+
+
+def distance_meters(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    delta_phi = phi2 - phi1
+    delta_lambda = math.radians(lon2 - lon1)
+    a = math.sin(delta_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+
+def _search_precision(lat, max_distance, precision):
+    while precision > 1:
+        cell_lat, cell_lon = geohash_cell_size(precision)
+        smallest_side = min(cell_lat, cell_lon * math.cos(math.radians(lat))) * _METERS_PER_DEGREE
+        if smallest_side >= max_distance:
+            break
+        precision -= 1
+    return precision
+
+
+class GeoTileCache:
+    def __init__(self, path, precision, ttl_seconds, max_entries):
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(":memory:" if path is None else str(path), check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS geo_tiles ("
+                "kind TEXT NOT NULL, geohash TEXT NOT NULL, lat REAL NOT NULL, lon REAL NOT NULL, "
+                "value TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "PRIMARY KEY (kind, geohash))"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS geo_tiles_accessed ON geo_tiles (accessed_at)")
+
+    def nearest(self, kind, lat, lon, max_distance):
+        search_precision = _search_precision(lat, max_distance, self.precision)
+        tiles = geohash_with_neighbours(lat, lon, search_precision)
+        now = time.time()
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                f"SELECT geohash, lat, lon, value FROM geo_tiles "
+                f"WHERE kind = ? AND substr(geohash, 1, ?) IN ({','.join('?' * len(tiles))}) AND stored_at >= ?",
+                [kind, search_precision, *tiles, now - self.ttl_seconds],
+            ).fetchall()
+            best = None
+            for geohash, tile_lat, tile_lon, value in rows:
+                distance = distance_meters(lat, lon, tile_lat, tile_lon)
+                if distance <= max_distance and (best is None or distance < best[0]):
+                    best = (distance, geohash, value)
+            if best is None:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+                return None
+            self._connection.execute(
+                "UPDATE geo_tiles SET accessed_at = ? WHERE kind = ? AND geohash = ?",
+                (now, kind, best[1]),
+            )
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+            return json.loads(best[2])
+
+    def put(self, kind, lat, lon, value):
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO geo_tiles (kind, geohash, lat, lon, value, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, geohash_encode(lat, lon, self.precision), lat, lon, json.dumps(value), now, now),
+            )
+            self._connection.execute(
+                "DELETE FROM geo_tiles WHERE rowid IN ("
+                "SELECT rowid FROM geo_tiles ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM geo_tiles").fetchone()[0]
+            return {"entries": entries, "hits": dict(self.hits), "misses": dict(self.misses)}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_geo_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = GeoTileCache(
+                    SETTINGS.geo_cache_path,
+                    SETTINGS.geo_cache_precision,
+                    SETTINGS.geo_cache_ttl_seconds,
+                    SETTINGS.geo_cache_max_entries,
+                )
+            except (OSError, sqlite3.Error) as error:
+                print(f"Geo cache unavailable: {error}")
+                return None
+        return _cache
+
+
+def reset_geo_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
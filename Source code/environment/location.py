@@ -1,50 +1,87 @@
 import requests
 
 from config import SETTINGS
+from environment.geo_cache import get_geo_cache
 
 
-def get_surroundings_from_coords(lat, lon):
-    surroundings = {"city": "Unknown", "state": "Unknown", "country": "Unknown", "features": []}
+PLACES_RADIUS_METERS = 1000
+
+
+def default_surroundings():
+    return {"city": "Unknown", "state": "Unknown", "country": "Unknown", "features": []}
+
+
+def _reverse_geocode(lat, lon):
+    response = requests.get(
+        f"{SETTINGS.geoapify_base_url}/v1/geocode/reverse",
+        params={"lat": lat, "lon": lon, "apiKey": SETTINGS.geoapify_api_key},
+        timeout=6,
+    )
+    response.raise_for_status()
+    data = response.json()
+    if not data.get("features"):
+        return {}
+    props = data["features"][0]["properties"]
+    return {
+        "city": props.get("city") or props.get("town") or props.get("village") or "Unknown",
+        "state": props.get("state") or "Unknown",
+        "country": props.get("country") or "Unknown",
+        "road": props.get("road") or props.get("street"),
+        "natural": props.get("natural"),
+        "water": props.get("water"),
+    }
+
+
+def _nearby_places(lat, lon):
+    response = requests.get(
+        f"{SETTINGS.geoapify_base_url}/v2/places",
+        params={
+            "categories": "natural.beach,natural.water,poi.park,natural.mountain",
+            "filter": f"circle:{lon},{lat},{PLACES_RADIUS_METERS}",
+            "limit": 5,
+            "apiKey": SETTINGS.geoapify_api_key,
+        },
+        timeout=6,
+    )
+    response.raise_for_status()
+    features = []
+    for feature in response.json().get("features", []):
+        properties = feature.get("properties", {})
+        categories = properties.get("categories", [])
+        if categories:
+            features.append(
+                {
+                    "name": properties.get("name") or properties.get("formatted", ""),
+                    "category": categories,
+                }
+            )
+    return features
+
+
+def _cached(kind, lat, lon, max_distance, fetch):
+    cache = get_geo_cache()
+    if cache is not None:
+        value = cache.nearest(kind, lat, lon, max_distance)
+        if value is not None:
+            return value
+    value = fetch(lat, lon)
+    if cache is not None:
+        cache.put(kind, lat, lon, value)
+    return value
+
+
+def fetch_surroundings(lat, lon):
     if not SETTINGS.geoapify_api_key:
-        return surroundings
+        return None
     try:
-        reverse_response = requests.get(
-            "https://api.geoapify.com/v1/geocode/reverse",
-            params={"lat": lat, "lon": lon, "apiKey": SETTINGS.geoapify_api_key},
-            timeout=6,
-        )
-        reverse_data = reverse_response.json()
-        if reverse_data.get("features"):
-            props = reverse_data["features"][0]["properties"]
-            surroundings["city"] = props.get("city") or props.get("town") or props.get("village") or "Unknown"
-            surroundings["state"] = props.get("state") or "Unknown"
-            surroundings["country"] = props.get("country") or "Unknown"
-            surroundings["road"] = props.get("road") or props.get("street")
-            surroundings["natural"] = props.get("natural")
-            surroundings["water"] = props.get("water")
-
-        places_response = requests.get(
-            "https://api.geoapify.com/v2/places",
-            params={
-                "categories": "natural.beach,natural.water,poi.park,natural.mountain",
-                "filter": f"circle:{lon},{lat},1000",
-                "limit": 5,
-                "apiKey": SETTINGS.geoapify_api_key,
-            },
-            timeout=6,
-        )
-        places_data = places_response.json()
-        for feature in places_data.get("features", []):
-            properties = feature.get("properties", {})
-            categories = properties.get("categories", [])
-            if categories:
-                surroundings["features"].append(
-                    {
-                        "name": properties.get("name") or properties.get("formatted", ""),
-                        "category": categories,
-                    }
-                )
+        surroundings = default_surroundings()
+        surroundings.update(_cached("reverse", lat, lon, SETTINGS.geo_reverse_reuse_meters, _reverse_geocode))
+        surroundings["features"] = _cached("places", lat, lon, PLACES_RADIUS_METERS, _nearby_places)
         return surroundings
     except Exception as error:
         print(f"Error fetching surroundings: {error}")
-        return surroundings
+        return None
+
+
+def get_surroundings_from_coords(lat, lon):
+    return fetch_surroundings(lat, lon) or default_surroundings()
@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SETTINGS
+from environment.location import default_surroundings, fetch_surroundings
+from environment.traffic import get_traffic_status
+from environment.weather import get_weather_data
+from sensors.light_sensor import read_ambient_lux
+
+
+SourceReading = namedtuple("SourceReading", ["value", "fetched_at", "attempted_at", "error"])
+EnvironmentSnapshot = namedtuple(
+    "EnvironmentSnapshot",
+    ["lux", "traffic", "weather", "surroundings", "latitude", "longitude", "speed_kmh", "published_at"],
+)
+
+SOURCES = ("lux", "traffic", "weather", "surroundings")
+
+
+def reading_value(reading, max_age, fallback, now=None):
+    if reading.fetched_at is None or reading.value is None:
+        return fallback
+    if (now or time.time()) - reading.fetched_at > max_age:
+        return fallback
+    return reading.value
+
+
+def snapshot_ages(snapshot, now=None):
+    now = now or time.time()
+    ages = {}
+    for name in SOURCES:
+        reading = getattr(snapshot, name)
+        ages[name] = None if reading.fetched_at is None else round(now - reading.fetched_at, 1)
+    return ages
+
+
+def _read_lux(position):
+    return read_ambient_lux(samples=SETTINGS.lux_samples, delay=0.05)
+
+
+def _read_traffic(position):
+    lat, lon, speed_kmh = position
+    status = get_traffic_status(lat, lon, speed_kmh)
+    return None if status == "unknown" else status
+
+
+def _read_weather(position):
+    lat, lon, _ = position
+    return get_weather_data(lat, lon)
+
+
+def _read_surroundings(position):
+    lat, lon, _ = position
+    return fetch_surroundings(lat, lon)
+
+
+class EnvironmentService:
+    def __init__(self):
+        self.intervals = {
+            "lux": SETTINGS.lux_interval_seconds,
+            "traffic": SETTINGS.traffic_interval_seconds,
+            "weather": SETTINGS.weather_interval_seconds,
+            "surroundings": SETTINGS.surroundings_interval_seconds,
+        }
+        self.fetchers = {
+            "lux": _read_lux,
+            "traffic": _read_traffic,
+            "weather": _read_weather,
+            "surroundings": _read_surroundings,
+        }
+        self.fetches = dict.fromkeys(SOURCES, 0)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._position = (SETTINGS.default_latitude, SETTINGS.default_longitude, SETTINGS.simulated_speed_kmh)
+        self._due = dict.fromkeys(SOURCES, 0.0)
+        self._inflight = set()
+        self._readings = {name: SourceReading(None, None, None, None) for name in SOURCES}
+        self._snapshot = self._build_snapshot()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _build_snapshot(self):
+        lat, lon, speed_kmh = self._position
+        return EnvironmentSnapshot(
+            lux=self._readings["lux"],
+            traffic=self._readings["traffic"],
+            weather=self._readings["weather"],
+            surroundings=self._readings["surroundings"],
+            latitude=lat,
+            longitude=lon,
+            speed_kmh=speed_kmh,
+            published_at=time.time(),
+        )
+
+    def snapshot(self):
+        return self._snapshot
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=len(SOURCES), thread_name_prefix="environment")
+        self._thread = threading.Thread(target=self._schedule, name="environment-service", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _schedule(self):
+        while not self._stop.is_set():
+            now = time.time()
+            with self._lock:
+                ready = [name for name in SOURCES if self._due[name] <= now and name not in self._inflight]
+                for name in ready:
+                    self._inflight.add(name)
+                    self._due[name] = now + self.intervals[name]
+                position = self._position
+                next_due = min(self._due.values())
+                self._wake.clear()
+            for name in ready:
+                self._executor.submit(self._fetch, name, position)
+            self._wake.wait(timeout=max(0.1, next_due - now))
+
+    def _fetch(self, name, position):
+        attempted_at = time.time()
+        try:
+            value, error = self.fetchers[name](position), None
+        except Exception as exception:
+            value, error = None, str(exception)
+        with self._lock:
+            self._inflight.discard(name)
+            self.fetches[name] += 1
+            previous = self._readings[name]
+            if value is None:
+                self._readings[name] = previous._replace(attempted_at=attempted_at, error=error or "unavailable")
+            else:
+                self._readings[name] = SourceReading(value, attempted_at, attempted_at, None)
+            self._snapshot = self._build_snapshot()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self.running,
+                "fetches": dict(self.fetches),
+                "ages_s": snapshot_ages(self._snapshot),
+            }
+
+
+environment = EnvironmentService()
+
+
+def snapshot_context(snapshot, now=None):
+    max_age = SETTINGS.environment_max_age_seconds
+    return {
+        "lux": reading_value(snapshot.lux, max_age, SETTINGS.default_lux, now),
+        "traffic": reading_value(snapshot.traffic, max_age, "unknown", now),
+        "weather": reading_value(snapshot.weather, max_age, None, now),
+        "surroundings": reading_value(snapshot.surroundings, max_age, default_surroundings(), now),
+    }
@@ -8,7 +8,7 @@ def get_traffic_status(lat, lon, current_speed):
         return "unknown"
     try:
         response = requests.get(
-            "https://api.tomtom.com/traffic/services/4/flowSegmentData/absolute/10/json",
+            f"{SETTINGS.tomtom_base_url}/traffic/services/4/flowSegmentData/absolute/10/json",
             params={
                 "point": f"{lat},{lon}",
                 "unit": "KMPH",
@@ -3,14 +3,18 @@ import requests
 from config import SETTINGS
 
 
-def get_weather_data():
+def get_weather_data(lat=None, lon=None):
     if not SETTINGS.openweather_api_key:
         return None
+    if lat is None or lon is None:
+        location = {"q": f"{SETTINGS.default_city},{SETTINGS.default_country_code}"}
+    else:
+        location = {"lat": lat, "lon": lon}
     try:
         response = requests.get(
-            "https://api.openweathermap.org/data/2.5/weather",
+            f"{SETTINGS.openweather_base_url}/data/2.5/weather",
             params={
-                "q": f"{SETTINGS.default_city},{SETTINGS.default_country_code}",
+                **location,
                 "appid": SETTINGS.openweather_api_key,
                 "units": "metric",
             },
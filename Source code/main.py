@@ -1,6 +1,15 @@
 from web.server import app
+from camera.models import preload_face_models
+from camera.pycam import prewarm_picam2
 from config import SETTINGS
+from environment.service import environment
 
 
 if __name__ == "__main__":
+    if SETTINGS.preload_face_models:
+        preload_face_models()
+    if SETTINGS.frame_source.startswith("picamera") and not SETTINGS.monitor_cameras:
+        prewarm_picam2(SETTINGS.camera_lores_size if SETTINGS.camera_lores_enabled else None)
+    if SETTINGS.environment_service_enabled:
+        environment.start()
     app.run(debug=SETTINGS.flask_debug, use_reloader=False)
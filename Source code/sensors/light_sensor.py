@@ -10,12 +10,23 @@ except ImportError:
     busio = None
 
 
+_sensor = None
+
+
+def _get_sensor():
+    global _sensor
+    if _sensor is None:
+        i2c = busio.I2C(board.SCL, board.SDA)
+        _sensor = adafruit_tsl2561.TSL2561(i2c, address=0x29)
+    return _sensor
+
+
 def read_ambient_lux(samples=10, delay=0.1):
+    global _sensor
     if not all([adafruit_tsl2561, board, busio]):
         return None
     try:
-        i2c = busio.I2C(board.SCL, board.SDA)
-        sensor = adafruit_tsl2561.TSL2561(i2c, address=0x29)
+        sensor = _get_sensor()
         readings = []
         for _ in range(samples):
             lux = sensor.lux
@@ -26,5 +37,6 @@ def read_ambient_lux(samples=10, delay=0.1):
             return None
         return sum(readings) / len(readings)
     except Exception as error:
+        _sensor = None
         print(f"Lux sensor error: {error}")
         return None
@@ -0,0 +1,133 @@
+import json
+import sqlite3
+import threading
+import time
+
+from config import SETTINGS
+
+
+_SQLITE_CHUNK = 500
+ARTIST_BATCH_SIZE = 50
+
+
+class ArtistGenreCache:
+    def __init__(self, path, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS artist_genres ("
+                "artist_id TEXT PRIMARY KEY, genres TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS artist_genres_accessed ON artist_genres (accessed_at)"
+            )
+
+    def get_many(self, artist_ids):
+        artist_ids = list(dict.fromkeys(artist_ids))
+        now = time.time()
+        found = {}
+        with self._lock, self._connection:
+            for index in range(0, len(artist_ids), _SQLITE_CHUNK):
+                chunk = artist_ids[index : index + _SQLITE_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT artist_id, genres FROM artist_genres "
+                    f"WHERE artist_id IN ({placeholders}) AND fetched_at >= ?",
+                    [*chunk, now - self.ttl_seconds],
+                ).fetchall()
+                for artist_id, genres in rows:
+                    found[artist_id] = json.loads(genres)
+                if rows:
+                    self._connection.executemany(
+                        "UPDATE artist_genres SET accessed_at = ? WHERE artist_id = ?",
+                        [(now, artist_id) for artist_id, _ in rows],
+                    )
+            self.hits += len(found)
+            self.misses += len(artist_ids) - len(found)
+        return found
+
+    def put_many(self, genres_by_artist):
+        if not genres_by_artist:
+            return
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO artist_genres (artist_id, genres, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(artist_id, json.dumps(genres), now, now) for artist_id, genres in genres_by_artist.items()],
+            )
+            self._connection.execute(
+                "DELETE FROM artist_genres WHERE artist_id IN ("
+                "SELECT artist_id FROM artist_genres ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM artist_genres").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_artist_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = ArtistGenreCache(
+                    SETTINGS.artist_cache_path,
+                    SETTINGS.artist_cache_ttl_seconds,
+                    SETTINGS.artist_cache_max_entries,
+                )
+            except (OSError, sqlite3.Error) as error:
+                print(f"Artist genre cache unavailable: {error}")
+                return None
+        return _cache
+
+
+def reset_artist_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
+
+
+def get_artist_genres(sp, artist_ids):
+    cache = get_artist_cache()
+    genres_by_artist = cache.get_many(artist_ids) if cache else {}
+    missing = [artist_id for artist_id in dict.fromkeys(artist_ids) if artist_id not in genres_by_artist]
+    fetched = {}
+    for index in range(0, len(missing), ARTIST_BATCH_SIZE):
+        batch = missing[index : index + ARTIST_BATCH_SIZE]
+        try:
+            response = sp.artists(batch).get("artists", [])
+        except Exception as error:
+            print(f"Artist genre lookup failed: {error}")
+            continue
+        for artist in response:
+            if artist and artist.get("id"):
+                fetched[artist["id"]] = [genre.lower() for genre in artist.get("genres", [])]
+    if cache:
+        cache.put_many(fetched)
+    genres_by_artist.update(fetched)
+    return genres_by_artist
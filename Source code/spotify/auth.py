@@ -1,12 +1,22 @@
+import threading
+import time
+
+import requests
 from flask import session
+from requests.adapters import HTTPAdapter
 from spotipy import Spotify
 from spotipy.cache_handler import FlaskSessionCacheHandler
 from spotipy.oauth2 import SpotifyOAuth
+from urllib3.util.retry import Retry
 
 from config import SETTINGS, SPOTIFY_SCOPE
 from utils import state
 
 
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+NON_IDEMPOTENT_METHODS = frozenset(["POST"])
+
+
 def spotify_auth_ready():
     return all(
         [
@@ -34,17 +44,91 @@ sp_oauth = (
 
 def set_token_info(token_info):
     state.spotify_token_info = token_info
+    state.spotify_user_id = None
+
+
+class SharedTokenManager:
+    def __init__(self, oauth, refresh_margin_seconds):
+        self.oauth = oauth
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.refreshes = 0
+        self._lock = threading.Lock()
+
+    def _needs_refresh(self, token_info):
+        return token_info.get("expires_at", 0) - time.time() < self.refresh_margin_seconds
+
+    def get_access_token(self, as_dict=False):
+        token_info = state.spotify_token_info
+        if token_info is None:
+            raise RuntimeError("Spotify is not authorized.")
+        if self._needs_refresh(token_info):
+            with self._lock:
+                token_info = state.spotify_token_info
+                if self._needs_refresh(token_info):
+                    token_info = self.oauth.refresh_access_token(token_info["refresh_token"])
+                    state.spotify_token_info = token_info
+                    self.refreshes += 1
+        return token_info if as_dict else token_info["access_token"]
+
+
+class _SpotifyRetry(Retry):
+    def is_retry(self, method, status_code, has_retry_after=False):
+        # A 5xx can arrive after Spotify has committed a write, so only rate-limited POSTs are repeated.
+        if method.upper() in NON_IDEMPOTENT_METHODS and status_code != 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def _build_http_session():
+    retry = _SpotifyRetry(
+        total=SETTINGS.spotify_http_retries,
+        connect=None,
+        read=False,
+        status=SETTINGS.spotify_http_retries,
+        allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=SETTINGS.spotify_backoff_factor,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=SETTINGS.spotify_pool_size,
+        pool_maxsize=SETTINGS.spotify_pool_size,
+        max_retries=retry,
+    )
+    http_session = requests.Session()
+    http_session.mount("https://", adapter)
+    http_session.mount("http://", adapter)
+    return http_session
+
+
+def new_spotify_client(**credentials):
+    client = Spotify(
+        **credentials,
+        requests_session=_build_http_session(),
+        requests_timeout=SETTINGS.spotify_request_timeout_seconds,
+    )
+    client.prefix = SETTINGS.spotify_api_base_url
+    return client
+
+
+token_manager = (
+    SharedTokenManager(sp_oauth, SETTINGS.spotify_token_refresh_margin_seconds) if sp_oauth is not None else None
+)
+_client = None
+_client_lock = threading.Lock()
 
 
 def get_spotify_client():
-    if state.spotify_token_info is None or sp_oauth is None:
+    global _client
+    if state.spotify_token_info is None or token_manager is None:
         return None
     try:
-        if sp_oauth.is_token_expired(state.spotify_token_info):
-            state.spotify_token_info = sp_oauth.refresh_access_token(
-                state.spotify_token_info["refresh_token"]
-            )
+        token_manager.get_access_token()
     except Exception as error:
         print(f"Error refreshing token: {error}")
         return None
-    return Spotify(auth=state.spotify_token_info["access_token"])
+    with _client_lock:
+        if _client is None:
+            _client = new_spotify_client(auth_manager=token_manager)
+        return _client
@@ -0,0 +1,51 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from config import SETTINGS
+
+
+class ContextAssembler:
+    def __init__(self, budget_seconds=None):
+        self.budget_seconds = budget_seconds or SETTINGS.context_budget_seconds
+        self._sources = []
+        self.timed_out = []
+        self.failed = []
+        self.elapsed = 0.0
+
+    def add(self, name, func, *args, deadline=None, fallback=None):
+        self._sources.append((name, func, args, deadline, fallback))
+        return self
+
+    def run(self):
+        started = time.monotonic()
+        budget_end = started + self.budget_seconds
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self._sources)), thread_name_prefix="context")
+        try:
+            pending = []
+            for name, func, args, deadline, fallback in self._sources:
+                end = budget_end if deadline is None else min(budget_end, started + deadline)
+                pending.append((end, name, executor.submit(func, *args), fallback))
+            for end, name, future, fallback in sorted(pending, key=lambda entry: entry[0]):
+                try:
+                    results[name] = future.result(timeout=max(0.0, end - time.monotonic()))
+                except FutureTimeoutError:
+                    future.cancel()
+                    self.timed_out.append(name)
+                    results[name] = fallback
+                except Exception as error:
+                    print(f"Context source '{name}' failed: {error}")
+                    self.failed.append(name)
+                    results[name] = fallback
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.elapsed = time.monotonic() - started
+        return results
+
+    def report(self):
+        return {
+            "elapsed_s": round(self.elapsed, 3),
+            "timed_out": list(self.timed_out),
+            "failed": list(self.failed),
+        }
@@ -0,0 +1,182 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import SETTINGS
+
+
+def _temperature_band(weather):
+    try:
+        return int(float(weather["temp"]) // 5) * 5
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def profile_fingerprint(user_profile):
+    user_profile = user_profile or {}
+    payload = json.dumps(
+        [user_profile.get("top_genres", []), user_profile.get("top_artists", [])],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def decision_key(context):
+    weather = context.get("weather") or {}
+    parts = [
+        context.get("driver_state"),
+        context.get("time_of_day"),
+        context.get("light_condition"),
+        context.get("speed_condition"),
+        context.get("traffic"),
+        weather.get("condition"),
+        _temperature_band(weather),
+        profile_fingerprint(context.get("user_profile")),
+    ]
+    return "|".join("" if part is None else str(part).lower() for part in parts)
+
+
+class DecisionCache:
+    def __init__(self, ttl_seconds, stale_seconds, max_entries, path=None):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._connection = None
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(path), check_same_thread=False)
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS music_decisions ("
+                    "context_key TEXT PRIMARY KEY, decision TEXT NOT NULL, stored_at REAL NOT NULL)"
+                )
+                connection.execute(
+                    "DELETE FROM music_decisions WHERE stored_at < ?",
+                    (time.time() - self.ttl_seconds - self.stale_seconds,),
+                )
+                rows = connection.execute(
+                    "SELECT context_key, decision, stored_at FROM music_decisions ORDER BY stored_at DESC LIMIT ?",
+                    (self.max_entries,),
+                ).fetchall()
+        except (OSError, sqlite3.Error) as error:
+            print(f"Music decision cache is memory-only: {error}")
+            return
+        for context_key, decision, stored_at in reversed(rows):
+            self._entries[context_key] = (json.loads(decision), stored_at)
+        self._connection = connection
+
+    def get(self, context_key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(context_key)
+            if entry is not None:
+                decision, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl_seconds:
+                    self._entries.move_to_end(context_key)
+                    self.hits += 1
+                    return copy.deepcopy(decision), True
+                if age < self.ttl_seconds + self.stale_seconds:
+                    self._entries.move_to_end(context_key)
+                    self.stale_hits += 1
+                    return copy.deepcopy(decision), False
+                del self._entries[context_key]
+            self.misses += 1
+            return None, False
+
+    def put(self, context_key, decision):
+        now = time.time()
+        with self._lock:
+            self._entries[context_key] = (copy.deepcopy(decision), now)
+            self._entries.move_to_end(context_key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            if self._connection is None:
+                return
+            try:
+                with self._connection:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO music_decisions (context_key, decision, stored_at) VALUES (?, ?, ?)",
+                        (context_key, json.dumps(decision), now),
+                    )
+                    self._connection.executemany(
+                        "DELETE FROM music_decisions WHERE context_key = ?",
+                        [(key,) for key in evicted],
+                    )
+            except sqlite3.Error as error:
+                print(f"Could not persist music decision: {error}")
+
+    def revalidate(self, context_key, fetch):
+        with self._lock:
+            if context_key in self._refreshing:
+                return False
+            self._refreshing.add(context_key)
+
+        def refresh():
+            try:
+                decision = fetch()
+                if decision is not None:
+                    self.put(context_key, decision)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(context_key)
+
+        threading.Thread(target=refresh, name="decision-refresh", daemon=True).start()
+        return True
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_decision_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DecisionCache(
+                SETTINGS.decision_cache_ttl_seconds,
+                SETTINGS.decision_cache_stale_seconds,
+                SETTINGS.decision_cache_max_entries,
+                SETTINGS.decision_cache_path,
+            )
+        return _cache
+
+
+def reset_decision_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
@@ -0,0 +1,169 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import SETTINGS
+from spotify.tracks import TrackRecord
+
+try:
+    from spotipy.exceptions import SpotifyException
+except ImportError:
+    SpotifyException = None
+
+
+PLAYLIST_ITEM_FIELDS = "items(track(id,uri,name,artists(id,name)))"
+
+
+def retry_after_seconds(error):
+    if SpotifyException is None or not isinstance(error, SpotifyException) or error.http_status != 429:
+        return None
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("Retry-After", 1)))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class _RateGate:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+
+    def block(self, seconds):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def wait(self, deadline):
+        delay = min(self._blocked_until, deadline) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _discovery_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SETTINGS.discovery_workers, thread_name_prefix="discovery")
+        return _executor
+
+
+class DiscoveryEngine:
+    def __init__(self, sp, request_budget=None, call_timeout=None, deadline=None):
+        self.sp = sp
+        self.call_timeout = call_timeout or SETTINGS.discovery_call_timeout_seconds
+        self.deadline = deadline or SETTINGS.discovery_deadline_seconds
+        self.stats = {"calls": 0, "errors": 0, "timeouts": 0, "rate_limited": 0, "cancelled": 0, "abandoned": 0}
+        self._remaining = request_budget or SETTINGS.discovery_request_budget
+        self._lock = threading.Lock()
+        self._gate = _RateGate()
+        self._stop = threading.Event()
+        self._deadline_at = None
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _take_budget(self):
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            self.stats["calls"] += 1
+            return True
+
+    def _call(self, started, method, *args, **kwargs):
+        while not self._stop.is_set():
+            self._gate.wait(self._deadline_at)
+            if self._stop.is_set() or time.monotonic() >= self._deadline_at:
+                return None
+            started[0] = time.monotonic()
+            try:
+                return method(*args, **kwargs)
+            except Exception as error:
+                retry_after = retry_after_seconds(error)
+                if retry_after is None:
+                    raise
+                self._count("rate_limited")
+                self._gate.block(retry_after)
+                started[0] = None
+                if not self._take_budget():
+                    return None
+        return None
+
+    def stream(self, keywords, limit):
+        self._deadline_at = time.monotonic() + self.deadline
+        self._stop.clear()
+        produced = 0
+        pending = {}
+        abandoned = []
+        executor = _discovery_executor()
+
+        def submit(kind, label, method, *args, **kwargs):
+            if not self._take_budget():
+                return
+            started = [None]
+            future = executor.submit(self._call, started, method, *args, **kwargs)
+            pending[future] = (kind, label, started)
+
+        try:
+            for keyword in keywords:
+                submit("search", keyword, self.sp.search, q=f"{keyword} playlist", type="playlist", limit=10)
+
+            while pending and produced < limit:
+                now = time.monotonic()
+                if now >= self._deadline_at:
+                    break
+                running = [started[0] for _, _, started in pending.values() if started[0] is not None]
+                wake_at = min(running) + self.call_timeout if running else now + self.call_timeout
+                done, _ = wait(pending, timeout=max(0.0, min(wake_at, self._deadline_at) - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    kind, label, _ = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        self._count("errors")
+                        if kind == "search":
+                            print(f"Playlist search failed for '{label}': {error}")
+                        continue
+                    if not result:
+                        continue
+                    if kind == "search":
+                        for playlist in (result.get("playlists") or {}).get("items") or []:
+                            if playlist and playlist.get("id"):
+                                submit(
+                                    "items",
+                                    playlist["id"],
+                                    self.sp.playlist_items,
+                                    playlist["id"],
+                                    fields=PLAYLIST_ITEM_FIELDS,
+                                    limit=80,
+                                )
+                        continue
+                    for item in result.get("items", []):
+                        if produced >= limit:
+                            break
+                        record = TrackRecord.from_track(item.get("track"))
+                        if record is None:
+                            continue
+                        produced += 1
+                        yield record
+
+                now = time.monotonic()
+                for future, (_, _, started) in list(pending.items()):
+                    if started[0] is not None and now - started[0] >= self.call_timeout:
+                        pending.pop(future)
+                        abandoned.append(future)
+                        self._count("timeouts")
+        finally:
+            self._stop.set()
+            for future in pending:
+                if future.cancel():
+                    self._count("cancelled")
+                else:
+                    abandoned.append(future)
+            self._count("abandoned", sum(1 for future in abandoned if not future.done()))
@@ -0,0 +1,146 @@
+import csv
+import sqlite3
+import threading
+import time
+
+from config import SETTINGS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+FEATURE_COLUMNS = ("energy", "valence", "tempo")
+_SQLITE_CHUNK = 500
+_AUDIO_FEATURES_BATCH = 100
+_WEIGHTS = (0.45, 0.3, 0.25)
+
+
+class TrackFeatureStore:
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS track_features ("
+                "track_id TEXT PRIMARY KEY, energy REAL, valence REAL, tempo REAL, updated_at REAL NOT NULL)"
+            )
+
+    def columns(self, track_ids):
+        features = np.full((len(track_ids), len(FEATURE_COLUMNS)), np.nan)
+        rows_by_id = {}
+        unique_ids = [track_id for track_id in dict.fromkeys(track_ids) if track_id]
+        with self._lock:
+            for index in range(0, len(unique_ids), _SQLITE_CHUNK):
+                chunk = unique_ids[index : index + _SQLITE_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for track_id, *values in self._connection.execute(
+                    f"SELECT track_id, energy, valence, tempo FROM track_features WHERE track_id IN ({placeholders})",
+                    chunk,
+                ):
+                    rows_by_id[track_id] = values
+        for row, track_id in enumerate(track_ids):
+            values = rows_by_id.get(track_id)
+            if values is not None:
+                features[row] = [np.nan if value is None else value for value in values]
+        return features
+
+    def known(self, track_ids):
+        return ~np.isnan(self.columns(track_ids)).all(axis=1)
+
+    def put_many(self, features_by_track):
+        if not features_by_track:
+            return
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO track_features (track_id, energy, valence, tempo, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (track_id, values.get("energy"), values.get("valence"), values.get("tempo"), now)
+                    for track_id, values in features_by_track.items()
+                ],
+            )
+
+    def import_csv(self, path):
+        with open(path, newline="", encoding="utf-8") as handle:
+            rows = {
+                row["id"]: {column: float(row[column]) for column in FEATURE_COLUMNS if row.get(column)}
+                for row in csv.DictReader(handle)
+                if row.get("id")
+            }
+        self.put_many(rows)
+        return len(rows)
+
+    def count(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM track_features").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_feature_store():
+    global _store
+    if np is None:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = TrackFeatureStore(SETTINGS.track_features_path)
+                if SETTINGS.track_features_seed_file and SETTINGS.track_features_seed_file.exists():
+                    imported = _store.import_csv(SETTINGS.track_features_seed_file)
+                    print(f"Imported {imported} track features from {SETTINGS.track_features_seed_file}.")
+            except (OSError, ValueError, KeyError, sqlite3.Error) as error:
+                print(f"Track feature store unavailable: {error}")
+                return None
+        return _store
+
+
+def reset_feature_store():
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = None
+
+
+def fetch_missing_features(sp, store, track_ids):
+    missing = [track_id for track_id, seen in zip(track_ids, store.known(track_ids)) if track_id and not seen]
+    fetched = {}
+    for index in range(0, len(missing), _AUDIO_FEATURES_BATCH):
+        try:
+            response = sp.audio_features(missing[index : index + _AUDIO_FEATURES_BATCH]) or []
+        except Exception as error:
+            print(f"Audio features lookup failed: {error}")
+            break
+        for features in response:
+            if features and features.get("id"):
+                fetched[features["id"]] = {column: features.get(column) for column in FEATURE_COLUMNS}
+    store.put_many(fetched)
+    return len(fetched)
+
+
+def score_features(features, energy, valence, tempo_range):
+    low, high = sorted(float(value) for value in tempo_range)
+    span = max(high - low, 1.0)
+    tempo = features[:, 2]
+    tempo_miss = np.clip(np.maximum(low - tempo, tempo - high) / span, 0.0, 1.0)
+    distances = np.column_stack((np.abs(features[:, 0] - energy), np.abs(features[:, 1] - valence), tempo_miss))
+    weights = np.broadcast_to(np.asarray(_WEIGHTS), distances.shape)
+    known = ~np.isnan(distances)
+    weight_sum = np.where(known, weights, 0.0).sum(axis=1)
+    distance = np.where(known, distances * weights, 0.0).sum(axis=1)
+    return np.divide(
+        weight_sum - distance,
+        weight_sum,
+        out=np.full(len(features), 0.5),
+        where=weight_sum > 0,
+    )
@@ -0,0 +1,63 @@
+from functools import lru_cache
+
+
+class GenreMatcher:
+    def __init__(self, user_genres):
+        self.user_genres = [genre for genre in dict.fromkeys(user_genres) if genre]
+        total = len(self.user_genres)
+        self._weights = [1.0 / (rank + 1) for rank in range(total)]
+        self._total_weight = sum(self._weights)
+        self._user_index = {genre: rank for rank, genre in enumerate(self.user_genres)}
+        self._lengths = sorted({len(genre) for genre in self.user_genres})
+        self._substring_index = {}
+        for rank, genre in enumerate(self.user_genres):
+            for start in range(len(genre)):
+                for end in range(start + 1, len(genre) + 1):
+                    self._substring_index.setdefault(genre[start:end], set()).add(rank)
+        self._genre_memo = {}
+        self._artist_memo = {}
+
+    def matches(self, artist_genre):
+        matched = self._genre_memo.get(artist_genre)
+        if matched is not None:
+            return matched
+        ranks = set(self._substring_index.get(artist_genre, ()))
+        for length in self._lengths:
+            if length > len(artist_genre):
+                break
+            for start in range(len(artist_genre) - length + 1):
+                rank = self._user_index.get(artist_genre[start : start + length])
+                if rank is not None:
+                    ranks.add(rank)
+        matched = frozenset(ranks)
+        self._genre_memo[artist_genre] = matched
+        return matched
+
+    def score(self, artist_genres):
+        if not self._total_weight or not artist_genres:
+            return 0.0
+        ranks = set()
+        for artist_genre in artist_genres:
+            ranks.update(self.matches(artist_genre))
+        return sum(self._weights[rank] for rank in ranks) / self._total_weight
+
+    def score_artist(self, artist_id, artist_genres):
+        score = self._artist_memo.get(artist_id)
+        if score is None:
+            score = self.score(artist_genres)
+            if artist_genres:
+                self._artist_memo[artist_id] = score
+        return score
+
+
+@lru_cache(maxsize=8)
+def _matcher_for_profile(user_genres):
+    return GenreMatcher(user_genres)
+
+
+def matcher_for(user_genres):
+    return _matcher_for_profile(tuple(user_genres or ()))
+
+
+def clear_matchers():
+    _matcher_for_profile.cache_clear()
@@ -1,22 +1,104 @@
+import threading
 import time
+from collections import deque
 
+from config import SETTINGS
 
-def start_spotify_playback(sp, playlist_id):
-    try:
+
+class PlaybackController:
+    def __init__(self, confirm_timeout=None, poll_interval=None):
+        self.confirm_timeout = confirm_timeout or SETTINGS.playback_confirm_timeout_seconds
+        self.poll_interval = poll_interval or SETTINGS.playback_poll_interval_seconds
+        self.device_id = None
+        self.device_active = False
+        self.time_to_audio = deque(maxlen=50)
+        self.failures = 0
+        # Starts are serialized on the device cache; metrics have their own lock so stats() never waits on Spotify.
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def _select_device(self, sp):
         devices = sp.devices().get("devices", [])
         if not devices:
-            print("No available Spotify devices.")
-            return
+            self.device_id = None
+            return None
         computer_devices = [device for device in devices if device.get("type", "").lower() == "computer"]
         active_devices = [device for device in devices if device.get("is_active")]
         selected_device = computer_devices[0] if computer_devices else active_devices[0] if active_devices else devices[0]
-        device_id = selected_device["id"]
-        sp.transfer_playback(device_id=device_id, force_play=False)
-        time.sleep(1)
-        sp.start_playback(device_id=device_id, context_uri=f"spotify:playlist:{playlist_id}")
-        time.sleep(2)
-        playback = sp.current_playback()
-        if not playback or not playback.get("is_playing"):
-            print("Playback command sent but Spotify is still idle.")
-    except Exception as error:
-        print(f"Could not start playback: {error}")
+        self.device_id = selected_device["id"]
+        self.device_active = bool(selected_device.get("is_active"))
+        return self.device_id
+
+    def _send_play(self, sp, context_uri, deadline):
+        if self.device_id is None and self._select_device(sp) is None:
+            print("No available Spotify devices.")
+            return False
+        if not self.device_active:
+            sp.transfer_playback(device_id=self.device_id, force_play=False)
+        while True:
+            try:
+                sp.start_playback(device_id=self.device_id, context_uri=context_uri)
+                self.device_active = True
+                return True
+            except Exception as error:
+                if getattr(error, "http_status", None) != 404 or time.monotonic() >= deadline:
+                    raise
+            time.sleep(self.poll_interval)
+            if self._select_device(sp) is None:
+                print("No available Spotify devices.")
+                return False
+            if not self.device_active:
+                sp.transfer_playback(device_id=self.device_id, force_play=False)
+
+    def _wait_for_audio(self, sp, context_uri, deadline):
+        while True:
+            playback = sp.current_playback()
+            if playback and playback.get("is_playing") and (playback.get("context") or {}).get("uri") == context_uri:
+                return True
+            if time.monotonic() + self.poll_interval >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def start(self, sp, playlist_id):
+        context_uri = f"spotify:playlist:{playlist_id}"
+        started = time.monotonic()
+        deadline = started + self.confirm_timeout
+        with self._start_lock:
+            try:
+                if not self._send_play(sp, context_uri, deadline):
+                    return None
+                playing = self._wait_for_audio(sp, context_uri, deadline)
+            except Exception as error:
+                self.device_id = None
+                self._record_failure()
+                print(f"Could not start playback: {error}")
+                return None
+            if not playing:
+                self.device_active = False
+                self._record_failure()
+                print("Playback command sent but Spotify is still idle.")
+                return None
+        elapsed = time.monotonic() - started
+        with self._stats_lock:
+            self.time_to_audio.append(elapsed)
+        print(f"Playback started in {elapsed:.2f} s.")
+        return elapsed
+
+    def _record_failure(self):
+        with self._stats_lock:
+            self.failures += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "starts": len(self.time_to_audio),
+                "failures": self.failures,
+                "last_time_to_audio_s": round(self.time_to_audio[-1], 3) if self.time_to_audio else None,
+            }
+
+
+playback = PlaybackController()
+
+
+def start_spotify_playback(sp, playlist_id):
+    return playback.start(sp, playlist_id)
@@ -1,14 +1,26 @@
 import datetime as dt
 import json
+import math
 import random
 import time
 
 from config import SETTINGS
-from environment.location import get_surroundings_from_coords
+from environment.location import default_surroundings, get_surroundings_from_coords
+from environment.service import environment, snapshot_ages, snapshot_context
 from environment.traffic import get_traffic_status
 from environment.weather import get_weather_data
 from sensors.light_sensor import read_ambient_lux
+from spotify.artist_cache import ARTIST_BATCH_SIZE, get_artist_cache, get_artist_genres
+from spotify.context import ContextAssembler
+from spotify.decision_cache import decision_key, get_decision_cache
+from spotify.discovery import DiscoveryEngine
+from spotify.feature_store import fetch_missing_features, get_feature_store, np, score_features
+from spotify.genre_matcher import matcher_for
 from spotify.playback import start_spotify_playback
+from spotify.playlist_sync import apply_playlist_update, plan_playlist_update, playing_uri
+from spotify.prefetch import likely_states, prefetcher
+from spotify.taste_profile import current_user_id, get_taste_profile, get_taste_profile_cache
+from spotify.tracks import to_records
 from utils import state
 
 try:
@@ -33,6 +45,8 @@ SEARCH_KEYWORDS = {
     "Calm": ["chill drive", "steady focus", "lo-fi driving"],
 }
 
+SELECTION_JITTER = 0.05
+
 _openai_client = None
 
 
@@ -42,7 +56,7 @@ def _get_openai_client():
         return _openai_client
     if OpenAI is None or not SETTINGS.openai_api_key:
         return None
-    _openai_client = OpenAI(api_key=SETTINGS.openai_api_key)
+    _openai_client = OpenAI(api_key=SETTINGS.openai_api_key, base_url=SETTINGS.openai_base_url or None)
     return _openai_client
 
 
@@ -149,11 +163,51 @@ def _fallback_music_decision(context, user_genres):
     }
 
 
-def get_openai_music_decision(context, user_genres):
-    client = _get_openai_client()
-    if client is None:
-        return _fallback_music_decision(context, user_genres)
+def _unit_interval(value, default):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    if math.isnan(value):
+        return default
+    return min(max(value, 0.0), 1.0)
+
+
+def _tempo_range(value, default):
+    if not isinstance(value, (list, tuple)):
+        return default
+    try:
+        low, high = sorted(float(bpm) for bpm in value)
+    except (TypeError, ValueError):
+        return default
+    if not (math.isfinite(low) and math.isfinite(high)) or low <= 0:
+        return default
+    return [low, high]
+
+
+def _string_list(value, default):
+    if not isinstance(value, list):
+        return default
+    return [item.strip() for item in value if isinstance(item, str) and item.strip()]
+
 
+def _normalize_music_decision(decision, defaults):
+    if not isinstance(decision, dict):
+        return None
+    normalized = dict(defaults)
+    normalized["energy"] = _unit_interval(decision.get("energy"), defaults["energy"])
+    normalized["valence"] = _unit_interval(decision.get("valence"), defaults["valence"])
+    normalized["tempo_range_bpm"] = _tempo_range(decision.get("tempo_range_bpm"), defaults["tempo_range_bpm"])
+    for key in ("preferred_genres", "avoid_genres", "spotify_search_queries"):
+        normalized[key] = _string_list(decision.get(key), defaults[key])
+    for key in ("familiarity_bias", "vocal_preference"):
+        value = decision.get(key)
+        if isinstance(value, str) and value.strip():
+            normalized[key] = value.strip()
+    return normalized
+
+
+def _request_music_decision(client, context, defaults):
     system_prompt = (
         "You are an expert AI music curator for driving. "
         "Adapt music to driver alertness, traffic, environment, and personal taste. "
@@ -173,146 +227,141 @@ def get_openai_music_decision(context, user_genres):
             ],
             temperature=0.3,
         )
-        return json.loads(response.choices[0].message.content)
+        decision = json.loads(response.choices[0].message.content)
     except Exception as error:
         print(f"OpenAI request failed: {error}")
-        return _fallback_music_decision(context, user_genres)
+        return None
+    normalized = _normalize_music_decision(decision, defaults)
+    if normalized is None:
+        print("OpenAI returned a music decision that is not a JSON object.")
+    return normalized
 
 
-def get_discovery_tracks(sp, mood, user_genres, search_queries=None, max_tracks=400):
-    keywords = search_queries or SEARCH_KEYWORDS.get(mood, ["drive music"])
-    candidates = []
-    for keyword in keywords:
-        try:
-            results = sp.search(q=f"{keyword} playlist", type="playlist", limit=10)
-            playlists = results.get("playlists", {}).get("items", [])
-        except Exception as error:
-            print(f"Playlist search failed for '{keyword}': {error}")
-            playlists = []
-        for playlist in playlists:
-            try:
-                items = sp.playlist_items(playlist["id"], limit=80).get("items", [])
-            except Exception:
-                items = []
-            for item in items:
-                track = item.get("track")
-                if track and track.get("uri"):
-                    candidates.append(track)
-                if len(candidates) >= max_tracks * 2:
-                    break
-            if len(candidates) >= max_tracks * 2:
-                break
-        if len(candidates) >= max_tracks * 2:
-            break
+def get_openai_music_decision(context, user_genres):
+    defaults = _fallback_music_decision(context, user_genres)
+    client = _get_openai_client()
+    if client is None:
+        return defaults
 
-    if not candidates:
-        return []
+    cache = get_decision_cache()
+    context_key = decision_key(context)
+    decision, fresh = cache.get(context_key)
+    if decision is not None:
+        if not fresh:
+            cache.revalidate(context_key, lambda: _request_music_decision(client, context, defaults))
+        return _normalize_music_decision(decision, defaults) or defaults
 
-    artist_cache = {}
-    artist_ids = list(
-        {
-            track["artists"][0]["id"]
-            for track in candidates
-            if track.get("artists") and track["artists"][0].get("id")
-        }
-    )
-    for index in range(0, len(artist_ids), 50):
-        try:
-            response = sp.artists(artist_ids[index : index + 50]).get("artists", [])
-        except Exception as error:
-            print(f"Artist genre lookup failed: {error}")
-            response = []
-        for artist in response:
-            artist_cache[artist["id"]] = [genre.lower() for genre in artist.get("genres", [])]
-
-    def genre_match(artist_genres):
-        if not user_genres or not artist_genres:
-            return False
-        for artist_genre in artist_genres:
-            for user_genre in user_genres:
-                if user_genre in artist_genre or artist_genre in user_genre:
-                    return True
-        return False
+    decision = _request_music_decision(client, context, defaults)
+    if decision is None:
+        return defaults
+    cache.put(context_key, decision)
+    return decision
 
+
+def get_discovery_tracks(sp, mood, user_genres, search_queries=None, max_tracks=400):
+    keywords = search_queries or SEARCH_KEYWORDS.get(mood, ["drive music"])
+    engine = DiscoveryEngine(sp)
+    matcher = matcher_for(user_genres)
+    genres_by_artist = {}
+    seen = set()
+    waiting = []
+    unknown_artists = set()
     matches = []
-    for track in candidates:
-        try:
-            artist_id = track["artists"][0]["id"]
-            if genre_match(artist_cache.get(artist_id, [])):
-                matches.append(track)
+    unmatched = []
+
+    def place(record):
+        record.score = matcher.score_artist(record.artist_id, genres_by_artist.get(record.artist_id, []))
+        if record.score > 0:
+            matches.append(record)
+        else:
+            unmatched.append(record)
+
+    def score_waiting():
+        genres_by_artist.update(get_artist_genres(sp, list(unknown_artists)))
+        unknown_artists.clear()
+        for record in waiting:
+            place(record)
+        waiting.clear()
+
+    stream = engine.stream(keywords, max_tracks * 2)
+    try:
+        for record in stream:
+            if not record.artist_id:
+                continue
+            key = record.key
+            if key in seen:
+                continue
+            seen.add(key)
+            if record.artist_id in genres_by_artist:
+                place(record)
+            else:
+                waiting.append(record)
+                unknown_artists.add(record.artist_id)
+                if len(unknown_artists) >= ARTIST_BATCH_SIZE:
+                    score_waiting()
             if len(matches) >= max_tracks:
                 break
-        except Exception:
-            continue
+    finally:
+        stream.close()
+    score_waiting()
+    print(f"Discovery calls: {engine.stats}")
+    genre_cache = get_artist_cache()
+    if genre_cache:
+        print(f"Artist genre cache: {genre_cache.stats()}")
 
     if matches:
-        return matches
+        matches.sort(key=lambda record: -record.score)
+        return matches[:max_tracks]
 
-    return random.sample(candidates, min(len(candidates), max_tracks))
+    return random.sample(unmatched, min(len(unmatched), max_tracks))
 
 
-def _collect_runtime_inputs():
+def _read_lux():
     lux_input = read_ambient_lux()
     if lux_input is None:
-        lux_input = SETTINGS.default_lux
-    return (
-        lux_input,
-        SETTINGS.simulated_speed_kmh,
-        SETTINGS.default_latitude,
-        SETTINGS.default_longitude,
-    )
-
+        return SETTINGS.default_lux
+    return lux_input
 
-def _current_user_profile(sp):
-    try:
-        top_tracks_full = sp.current_user_top_tracks(limit=50, time_range="medium_term")["items"]
-        top_artists_full = sp.current_user_top_artists(limit=20, time_range="medium_term")["items"]
-    except Exception:
-        return [], [], [], [], []
 
-    top_tracks = [track for track in top_tracks_full if track.get("uri")]
-    top_artist_ids = [artist["id"] for artist in top_artists_full if artist.get("id")]
-    user_genres = []
-    for artist in top_artists_full:
-        user_genres.extend([genre.lower() for genre in artist.get("genres", [])])
-    user_genres = list(dict.fromkeys(user_genres))
-    return top_tracks_full, top_artists_full, top_tracks, top_artist_ids, user_genres
+def _taste_profile(sp):
+    profile = get_taste_profile(sp)
+    print(f"Taste profile cache: {get_taste_profile_cache().stats()}")
+    return profile
 
 
-def create_smart_playlist(sp, total_tracks=None):
+def build_candidate_pool(sp, driver_state, total_tracks=None):
     total_tracks = total_tracks or SETTINGS.total_tracks
-    lux_input, speed_input, lat, lon = _collect_runtime_inputs()
-    traffic_status = get_traffic_status(lat, lon, speed_input)
-    environment_data = get_environment_conditions(lux_input, speed_kmh=speed_input)
-    surroundings = get_surroundings_from_coords(lat, lon)
-    weather = get_weather_data() or {}
-
-    if state.created_playlist_id:
-        try:
-            sp.current_user_unfollow_playlist(state.created_playlist_id)
-        except Exception as error:
-            print(f"Could not delete old playlist: {error}")
-        state.created_playlist_id = None
-
-    mood_description = MOOD_PARAMS.get(state.driver_state, MOOD_PARAMS["Wakefulness"])
-    playlist_name = f"Drive Mood - {state.driver_state} - {int(time.time())}"
-
-    try:
-        user_id = sp.current_user()["id"]
-        playlist = sp.user_playlist_create(
-            user=user_id,
-            name=playlist_name,
-            public=False,
-            description=mood_description,
+    speed_input = SETTINGS.simulated_speed_kmh
+    lat, lon = SETTINGS.default_latitude, SETTINGS.default_longitude
+    assembler = ContextAssembler().add("profile", _taste_profile, sp, deadline=5.0, fallback=None)
+    if environment.running:
+        snapshot = environment.snapshot()
+        lat, lon, speed_input = snapshot.latitude, snapshot.longitude, snapshot.speed_kmh
+        environment_inputs = snapshot_context(snapshot)
+        print(f"Environment snapshot ages: {snapshot_ages(snapshot)}")
+    else:
+        environment_inputs = None
+        (
+            assembler.add("lux", _read_lux, deadline=2.0, fallback=SETTINGS.default_lux)
+            .add("traffic", get_traffic_status, lat, lon, speed_input, deadline=4.0, fallback="unknown")
+            .add("surroundings", get_surroundings_from_coords, lat, lon, deadline=4.0, fallback=default_surroundings())
+            .add("weather", get_weather_data, deadline=4.0, fallback=None)
         )
-        state.created_playlist_id = playlist["id"]
-    except Exception as error:
-        print(f"Error creating playlist: {error}")
-        return None
+    inputs = assembler.run()
+    inputs.update(environment_inputs or {})
+    print(f"Context sources: {assembler.report()}")
+    lux_input = inputs["lux"]
+    traffic_status = inputs["traffic"]
+    surroundings = inputs["surroundings"]
+    weather = inputs["weather"] or {}
+    environment_data = get_environment_conditions(lux_input, speed_kmh=speed_input)
 
-    top_tracks_full, top_artists_full, top_tracks, top_artist_ids, user_genres = _current_user_profile(sp)
+    profile = inputs["profile"] or {"user_id": None, "top_tracks": [], "top_artists": [], "genres": []}
+    top_tracks = profile["top_tracks"]
+    top_artists = profile["top_artists"]
+    user_genres = profile["genres"]
     context = {
-        "driver_state": state.driver_state,
+        "driver_state": driver_state,
         "time_of_day": environment_data["time_of_day"],
         "light_condition": environment_data["light_condition"],
         "lux": lux_input,
@@ -327,27 +376,29 @@ def create_smart_playlist(sp, total_tracks=None):
         },
         "user_profile": {
             "top_genres": user_genres[:10],
-            "top_artists": [artist["name"] for artist in top_artists_full[:5]],
-            "top_tracks": [track["name"] for track in top_tracks_full[:5]],
+            "top_artists": [artist["name"] for artist in top_artists[:5]],
+            "top_tracks": [track["name"] for track in top_tracks[:5]],
         },
     }
     decision = get_openai_music_decision(context, user_genres)
-    search_queries = decision.get("spotify_search_queries") or SEARCH_KEYWORDS.get(state.driver_state, ["drive music"])
+    if _get_openai_client() is not None:
+        print(f"Music decision cache: {get_decision_cache().stats()}")
+    search_queries = decision.get("spotify_search_queries") or SEARCH_KEYWORDS.get(driver_state, ["drive music"])
     preferred_genres = decision.get("preferred_genres") or user_genres[:3]
-    tempo_range = decision.get("tempo_range_bpm") or [90, 130]
-    energy_target = decision.get("energy", 0.6)
+    tempo_range = decision["tempo_range_bpm"]
+    energy_target = decision["energy"]
 
     discovery_tracks = get_discovery_tracks(
         sp,
-        state.driver_state,
+        driver_state,
         user_genres,
         search_queries=search_queries,
         max_tracks=int(total_tracks * 1.5),
     )
     recommendation_tracks = []
     try:
-        seed_tracks = [track.get("id") for track in top_tracks_full[:5] if track.get("id")]
-        seed_artists = list(dict.fromkeys(top_artist_ids))[:5]
+        seed_tracks = [track["id"] for track in top_tracks[:5] if track["id"]]
+        seed_artists = list(dict.fromkeys(artist["id"] for artist in top_artists if artist["id"]))[:5]
         recommendation_tracks = sp.recommendations(
             seed_tracks=seed_tracks[:2],
             seed_artists=seed_artists[:2],
@@ -360,38 +411,140 @@ def create_smart_playlist(sp, total_tracks=None):
     except Exception as error:
         print(f"Spotify recommendations failed: {error}")
 
-    random.shuffle(discovery_tracks)
-    random.shuffle(top_tracks)
-    random.shuffle(recommendation_tracks)
-    combined_tracks = (
-        discovery_tracks[: int(total_tracks * 0.7)]
-        + top_tracks[: int(total_tracks * 0.15)]
-        + recommendation_tracks[: int(total_tracks * 0.15)]
+    feature_store = get_feature_store()
+    if feature_store is not None and SETTINGS.track_features_fetch:
+        track_ids = [record.id for record in discovery_tracks]
+        track_ids += [track.get("id") for track in top_tracks + recommendation_tracks]
+        fetch_missing_features(sp, feature_store, track_ids)
+
+    return {
+        "driver_state": driver_state,
+        "total_tracks": total_tracks,
+        "user_id": profile["user_id"],
+        "discovery": discovery_tracks,
+        "top": to_records(top_tracks),
+        "recommendations": to_records(recommendation_tracks),
+        "targets": {
+            "energy": energy_target,
+            "valence": decision["valence"],
+            "tempo_range": tempo_range,
+        },
+        "built_at": time.time(),
+    }
+
+
+def prefetch_candidate_pools(sp, estimate, blink_trend):
+    total_tracks = SETTINGS.total_tracks
+    for driver_state in likely_states(estimate, blink_trend, SETTINGS.prefetch_max_pools):
+        prefetcher.schedule(driver_state, lambda driver_state=driver_state: build_candidate_pool(sp, driver_state, total_tracks))
+
+
+def _feature_scores(records, targets):
+    store = get_feature_store()
+    if store is None or not records or not targets:
+        return None
+    features = store.columns([record.id for record in records])
+    if np.isnan(features).all():
+        return None
+    scores = score_features(features, targets["energy"], targets["valence"], targets["tempo_range"])
+    return scores + np.random.uniform(0.0, SELECTION_JITTER, len(scores))
+
+
+def _select_uris(pool, total_tracks):
+    sources = (
+        (pool["discovery"], int(total_tracks * 0.7)),
+        (pool["top"], int(total_tracks * 0.15)),
+        (pool["recommendations"], int(total_tracks * 0.15)),
     )
+    records = [record for source, _ in sources for record in source]
+    scores = _feature_scores(records, pool.get("targets"))
+
+    combined_tracks = []
+    offset = 0
+    for source, count in sources:
+        if scores is None:
+            combined_tracks.extend(random.sample(source, min(len(source), count)))
+        else:
+            best = np.argsort(-scores[offset : offset + len(source)], kind="stable")[:count]
+            combined_tracks.extend(source[index] for index in best)
+        offset += len(source)
     random.shuffle(combined_tracks)
 
     seen = set()
     uris = []
-    for track in combined_tracks:
-        if not track or not track.get("uri"):
-            continue
-        artist_name = track["artists"][0]["name"] if track.get("artists") else ""
-        track_key = f"{(track.get('name') or '').lower().strip()}-{artist_name.lower().strip()}"
-        if track_key in seen:
+    for record in combined_tracks:
+        key = record.key
+        if key in seen:
             continue
-        seen.add(track_key)
-        uris.append(track["uri"])
+        seen.add(key)
+        uris.append(record.uri)
         if len(uris) >= total_tracks:
             break
+    return uris
+
+
+def _discard_created_playlist(sp):
+    try:
+        sp.current_user_unfollow_playlist(state.created_playlist_id)
+    except Exception as error:
+        print(f"Could not delete the playlist created after stop: {error}")
+    state.created_playlist_id = None
+    state.playlist_uris = []
+
 
+def create_smart_playlist(sp, total_tracks=None):
+    total_tracks = total_tracks or SETTINGS.total_tracks
+    driver_state = state.driver_state
+    pool = prefetcher.take(driver_state, total_tracks)
+    if pool is None:
+        pool = build_candidate_pool(sp, driver_state, total_tracks)
+    else:
+        print(f"Using the prefetched {driver_state} pool built {time.time() - pool['built_at']:.1f} s ago.")
+
+    uris = _select_uris(pool, total_tracks)
     if not uris:
         print("No playlist tracks were collected.")
         return None
+    if state.stop_event.is_set():
+        print("Monitoring was stopped; the playlist is not updated.")
+        return None
+
+    if state.created_playlist_id and SETTINGS.playlist_update_mode == "diff":
+        return _update_session_playlist(sp, driver_state, uris, total_tracks)
+
+    if state.created_playlist_id:
+        try:
+            sp.current_user_unfollow_playlist(state.created_playlist_id)
+        except Exception as error:
+            print(f"Could not delete old playlist: {error}")
+        state.created_playlist_id = None
+        state.playlist_uris = []
+
+    mood_description = MOOD_PARAMS.get(driver_state, MOOD_PARAMS["Wakefulness"])
+    playlist_name = f"Drive Mood - {driver_state} - {int(time.time())}"
+
+    try:
+        user_id = pool["user_id"] or current_user_id(sp)
+        playlist = sp.user_playlist_create(
+            user=user_id,
+            name=playlist_name,
+            public=False,
+            description=mood_description,
+        )
+        state.created_playlist_id = playlist["id"]
+    except Exception as error:
+        print(f"Error creating playlist: {error}")
+        return None
 
     try:
         for index in range(0, len(uris), 100):
+            if state.stop_event.is_set():
+                break
             sp.playlist_add_items(state.created_playlist_id, uris[index : index + 100])
-            time.sleep(0.2)
+        if state.stop_event.is_set():
+            _discard_created_playlist(sp)
+            return None
+        state.playlist_uris = uris
         start_spotify_playback(sp, state.created_playlist_id)
     except Exception as error:
         print(f"Error adding tracks: {error}")
@@ -399,3 +552,23 @@ def create_smart_playlist(sp, total_tracks=None):
 
     state.playlist_created = True
     return state.created_playlist_id
+
+
+def _update_session_playlist(sp, driver_state, uris, total_tracks):
+    playlist_id = state.created_playlist_id
+    keep_uri, is_playing = playing_uri(sp, playlist_id)
+    operations, final_uris = plan_playlist_update(state.playlist_uris, uris, keep_uri, total_tracks)
+    if state.stop_event.is_set():
+        return None
+    try:
+        calls = apply_playlist_update(sp, playlist_id, operations)
+        state.playlist_uris = final_uris
+        if not is_playing and not state.stop_event.is_set():
+            start_spotify_playback(sp, playlist_id)
+    except Exception as error:
+        print(f"Error updating playlist: {error}")
+        return None
+
+    print(f"Updated the session playlist for {driver_state} with {calls} track calls.")
+    state.playlist_created = True
+    return playlist_id
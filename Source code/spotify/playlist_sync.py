@@ -0,0 +1,61 @@
+_BATCH = 100
+
+
+def _batches(items):
+    return [items[index : index + _BATCH] for index in range(0, len(items), _BATCH)]
+
+
+def _unique(uris):
+    return list(dict.fromkeys(uri for uri in uris if uri))
+
+
+def plan_playlist_update(current, desired, keep_uri=None, total_tracks=None):
+    current = _unique(current)
+    desired = _unique(desired)
+    total_tracks = total_tracks or len(desired)
+    desired = desired[:total_tracks]
+    wanted = set(desired)
+    if keep_uri in current and keep_uri not in wanted:
+        desired = desired[: max(total_tracks - 1, 0)]
+        wanted = set(desired) | {keep_uri}
+
+    kept = [uri for uri in current if uri in wanted]
+    removed = [uri for uri in current if uri not in wanted]
+    kept_set = set(kept)
+    added = [uri for uri in desired if uri not in kept_set]
+
+    diff_ops = [("remove", batch) for batch in _batches(removed)] + [("add", batch) for batch in _batches(added)]
+    final = kept + added
+    replace_batches = _batches(final)
+    replace_ops = [("replace", replace_batches[0] if replace_batches else [])]
+    replace_ops += [("add", batch) for batch in replace_batches[1:]]
+
+    if keep_uri in kept_set or len(diff_ops) < len(replace_ops):
+        return diff_ops, final
+    return replace_ops, final
+
+
+def apply_playlist_update(sp, playlist_id, operations):
+    for operation, uris in operations:
+        if operation == "replace":
+            sp.playlist_replace_items(playlist_id, uris)
+        elif operation == "remove":
+            sp.playlist_remove_all_occurrences_of_items(playlist_id, uris)
+        else:
+            sp.playlist_add_items(playlist_id, uris)
+    return len(operations)
+
+
+def playing_uri(sp, playlist_id):
+    try:
+        playback = sp.current_playback()
+    except Exception as error:
+        print(f"Could not read the current playback: {error}")
+        return None, False
+    if not playback:
+        return None, False
+    context = playback.get("context") or {}
+    if context.get("uri") != f"spotify:playlist:{playlist_id}":
+        return None, False
+    item = playback.get("item") or {}
+    return item.get("uri"), bool(playback.get("is_playing"))
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SETTINGS
+
+
+STATE_ORDER = ["Wakefulness", "Hypovigilance", "Drowsiness", "Microsleep"]
+
+
+def likely_states(estimate, blink_trend, count):
+    if estimate not in STATE_ORDER:
+        return [estimate][:count]
+    index = STATE_ORDER.index(estimate)
+    step = 1 if blink_trend >= 0 else -1
+    ordered = [estimate]
+    for offset in (step, -step):
+        neighbour = index + offset
+        if 0 <= neighbour < len(STATE_ORDER):
+            ordered.append(STATE_ORDER[neighbour])
+    return ordered[:count]
+
+
+class PoolPrefetcher:
+    def __init__(self, max_pools=None, ttl_seconds=None):
+        self.max_pools = max_pools or SETTINGS.prefetch_max_pools
+        self.ttl_seconds = ttl_seconds or SETTINGS.prefetch_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+        self._pools = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pool-prefetch")
+
+    def _fresh(self, pool):
+        return time.time() - pool["built_at"] < self.ttl_seconds
+
+    def schedule(self, driver_state, build):
+        with self._lock:
+            for stale in [name for name, pool in self._pools.items() if not self._fresh(pool)]:
+                del self._pools[stale]
+            pool = self._pools.get(driver_state)
+            if driver_state in self._inflight or (pool is not None and self._fresh(pool)):
+                return False
+            self._inflight[driver_state] = self._executor.submit(self._build, driver_state, build)
+        return True
+
+    def _build(self, driver_state, build):
+        try:
+            pool = build()
+        except Exception as error:
+            print(f"Prefetching the {driver_state} pool failed: {error}")
+            pool = None
+        with self._lock:
+            self._inflight.pop(driver_state, None)
+            if pool is None:
+                return
+            self._pools[driver_state] = pool
+            self._pools.move_to_end(driver_state)
+            while len(self._pools) > self.max_pools:
+                self._pools.popitem(last=False)
+
+    def take(self, driver_state, total_tracks):
+        with self._lock:
+            pending = self._inflight.get(driver_state)
+            if pending is not None and pending.cancel():
+                del self._inflight[driver_state]
+                pending = None
+        if pending is not None:
+            pending.result()
+            with self._lock:
+                self.joined += 1
+        with self._lock:
+            pool = self._pools.pop(driver_state, None)
+            if pool is None or not self._fresh(pool) or pool["total_tracks"] < total_tracks:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return pool
+
+    def clear(self):
+        with self._lock:
+            self._pools.clear()
+
+
+prefetcher = PoolPrefetcher()
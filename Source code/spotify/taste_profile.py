@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+
+from config import SETTINGS
+from utils import state
+
+
+def _compact_track(track):
+    return {
+        "id": track.get("id"),
+        "uri": track.get("uri"),
+        "name": track.get("name") or "",
+        "artists": [{"id": artist.get("id"), "name": artist.get("name") or ""} for artist in track.get("artists") or []],
+    }
+
+
+def _compact_artist(artist):
+    return {
+        "id": artist.get("id"),
+        "name": artist.get("name") or "",
+        "genres": [genre.lower() for genre in artist.get("genres", [])],
+    }
+
+
+def fetch_taste_profile(sp, user_id=None):
+    user_id = user_id or sp.current_user()["id"]
+    top_tracks = sp.current_user_top_tracks(limit=50, time_range="medium_term")["items"]
+    top_artists = sp.current_user_top_artists(limit=20, time_range="medium_term")["items"]
+    artists = [_compact_artist(artist) for artist in top_artists]
+    genres = []
+    for artist in artists:
+        genres.extend(artist["genres"])
+    return {
+        "user_id": user_id,
+        "top_tracks": [_compact_track(track) for track in top_tracks if track.get("uri")],
+        "top_artists": artists,
+        "genres": list(dict.fromkeys(genres)),
+        "fetched_at": time.time(),
+    }
+
+
+class TasteProfileCache:
+    def __init__(self, ttl_seconds, path=None):
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._profiles = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            self._profiles = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as error:
+            print(f"Could not read the cached taste profiles: {error}")
+
+    def _save(self):
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_suffix(".tmp")
+            temporary.write_text(json.dumps(self._profiles), encoding="utf-8")
+            temporary.replace(self.path)
+        except OSError as error:
+            print(f"Could not save the taste profiles: {error}")
+
+    def put(self, profile):
+        with self._lock:
+            self._profiles[profile["user_id"]] = profile
+            self._save()
+
+    def refresh_async(self, sp, user_id):
+        with self._lock:
+            if user_id in self._refreshing:
+                return False
+            self._refreshing.add(user_id)
+
+        def refresh():
+            try:
+                self.put(fetch_taste_profile(sp, user_id))
+            except Exception as error:
+                print(f"Taste profile refresh failed: {error}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(user_id)
+
+        threading.Thread(target=refresh, name="taste-profile-refresh", daemon=True).start()
+        return True
+
+    def get(self, sp, user_id):
+        with self._lock:
+            profile = self._profiles.get(user_id)
+            if profile is None:
+                self.misses += 1
+            elif time.time() - profile["fetched_at"] < self.ttl_seconds:
+                self.hits += 1
+                return profile
+            else:
+                self.stale_hits += 1
+        if profile is not None:
+            self.refresh_async(sp, user_id)
+            return profile
+        profile = fetch_taste_profile(sp, user_id)
+        self.put(profile)
+        return profile
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "profiles": len(self._profiles),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_taste_profile_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TasteProfileCache(SETTINGS.taste_profile_ttl_seconds, SETTINGS.taste_profile_path)
+        return _cache
+
+
+def reset_taste_profile_cache():
+    global _cache
+    with _cache_lock:
+        _cache = None
+    state.spotify_user_id = None
+
+
+def current_user_id(sp):
+    if state.spotify_user_id is None:
+        state.spotify_user_id = sp.current_user()["id"]
+    return state.spotify_user_id
+
+
+def get_taste_profile(sp):
+    return get_taste_profile_cache().get(sp, current_user_id(sp))
+
+
+def warm_taste_profile(sp):
+    def warm():
+        try:
+            get_taste_profile(sp)
+        except Exception as error:
+            print(f"Could not load the taste profile: {error}")
+
+    threading.Thread(target=warm, name="taste-profile-warm", daemon=True).start()
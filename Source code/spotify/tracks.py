@@ -0,0 +1,34 @@
+class TrackRecord:
+    __slots__ = ("uri", "id", "name", "artist_id", "artist_name", "score")
+
+    def __init__(self, uri, track_id, name, artist_id, artist_name):
+        self.uri = uri
+        self.id = track_id
+        self.name = name
+        self.artist_id = artist_id
+        self.artist_name = artist_name
+        self.score = 0.0
+
+    @classmethod
+    def from_track(cls, track):
+        if not track or not track.get("uri"):
+            return None
+        artists = track.get("artists") or [{}]
+        artist = artists[0] or {}
+        return cls(track["uri"], track.get("id"), track.get("name") or "", artist.get("id"), artist.get("name") or "")
+
+    @property
+    def key(self):
+        return (self.name.lower().strip(), self.artist_name.lower().strip())
+
+    def __repr__(self):
+        return f"TrackRecord({self.uri!r}, {self.name!r}, {self.artist_name!r})"
+
+
+def to_records(tracks):
+    records = []
+    for track in tracks:
+        record = TrackRecord.from_track(track)
+        if record is not None:
+            records.append(record)
+    return records
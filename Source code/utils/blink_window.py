@@ -0,0 +1,44 @@
+from collections import deque
+
+
+class BlinkWindow:
+    def __init__(self, window_seconds=60.0, capacity=512):
+        self.window_seconds = float(window_seconds)
+        self.capacity = max(1, int(capacity))
+        self._events = deque()
+        self._duration_sum = 0.0
+
+    def __len__(self):
+        return len(self._events)
+
+    @property
+    def count(self):
+        return len(self._events)
+
+    @property
+    def mean_duration(self):
+        if not self._events:
+            return 0.0
+        return self._duration_sum / len(self._events)
+
+    def add(self, timestamp, duration):
+        if len(self._events) >= self.capacity:
+            self._pop_oldest()
+        self._events.append((timestamp, duration))
+        self._duration_sum += duration
+
+    def expire(self, now):
+        cutoff = now - self.window_seconds
+        while self._events and self._events[0][0] < cutoff:
+            self._pop_oldest()
+
+    def clear(self):
+        self._events.clear()
+        self._duration_sum = 0.0
+
+    def _pop_oldest(self):
+        _, duration = self._events.popleft()
+        if self._events:
+            self._duration_sum -= duration
+        else:
+            self._duration_sum = 0.0
@@ -1,5 +1,14 @@
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_EAR_FROM = [1, 2, 0]
+_EAR_TO = [5, 4, 3]
+
 
 def euclidean_distance(p1, p2):
     return math.dist(p1, p2)
@@ -12,3 +21,16 @@ def eye_aspect_ratio(eye):
     if horizontal == 0:
         return 0.0
     return (vertical_1 + vertical_2) / (2.0 * horizontal)
+
+
+def eye_aspect_ratios(eyes):
+    eyes = np.asarray(eyes, dtype=np.float64)
+    deltas = eyes[..., _EAR_FROM, :] - eyes[..., _EAR_TO, :]
+    distances = np.hypot(deltas[..., 0], deltas[..., 1])
+    horizontal = 2.0 * distances[..., 2]
+    return np.divide(
+        distances[..., 0] + distances[..., 1],
+        horizontal,
+        out=np.zeros_like(horizontal),
+        where=horizontal != 0,
+    )
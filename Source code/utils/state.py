@@ -6,19 +6,28 @@ monitoring_thread = None
 monitoring_active = False
 playlist_created = False
 created_playlist_id = None
+playlist_uris = []
 spotify_token_info = None
+spotify_user_id = None
 driver_state = "Calm"
-picam2 = None
+cameras = {}
+monitor_supervisor = None
+pipeline_stats = None
+seat_states = {}
 
 
 def reset_playlist_state() -> None:
-    global playlist_created, created_playlist_id
+    global playlist_created, created_playlist_id, playlist_uris
     playlist_created = False
     created_playlist_id = None
+    playlist_uris = []
 
 
 def reset_monitoring_state() -> None:
-    global monitoring_thread, monitoring_active, picam2
+    global monitoring_thread, monitoring_active, monitor_supervisor, pipeline_stats
     monitoring_thread = None
     monitoring_active = False
-    picam2 = None
+    monitor_supervisor = None
+    pipeline_stats = None
+    cameras.clear()
+    seat_states.clear()
@@ -1,13 +1,19 @@
 import threading
 
-from flask import Flask, redirect, render_template_string, request, url_for
+from flask import Flask, Response, redirect, render_template_string, request, url_for
 
-from camera.driver_monitor import monitor_driver
+from camera.driver_monitor import monitor_driver, multi_camera_mode, playlist_updates
+from camera.models import model_stats
+from camera.preview import BOUNDARY, preview
 from config import SETTINGS
 from spotify.auth import get_spotify_client, set_token_info, sp_oauth, spotify_auth_ready
+from spotify.playback import playback
+from spotify.taste_profile import warm_taste_profile
 from utils import state
 
 
+PLAYLIST_STOP_TIMEOUT_SECONDS = 30
+
 app = Flask(__name__)
 app.config["SECRET_KEY"] = SETTINGS.app_secret_key
 
@@ -40,12 +46,47 @@ def home():
             <button type="submit">Stop Monitoring and Delete Playlist</button>
         </form>
         <p>Driver state: {{ driver_state }}</p>
+        {% if models.loaded %}
+        <p>Face models loaded in {{ models.load_seconds }} s.</p>
+        {% endif %}
+        {% if monitoring_active and not multi_camera %}
+        <p><a href="{{ url_for('preview_stream') }}">Live preview</a></p>
+        {% endif %}
+        {% if seat_states %}
+        <ul>
+            {% for seat, seat_state in seat_states.items() %}
+            <li>Seat {{ seat }}: {{ seat_state }}</li>
+            {% endfor %}
+        </ul>
+        {% endif %}
+        {% if cameras %}
+        <ul>
+            {% for camera_id, camera in cameras.items() %}
+            <li>Camera {{ camera_id }}: {{ camera.frames_captured }} frames captured, {{ camera.frames_dropped }} dropped,
+                worker {{ "failed" if camera.failed else ("running" if camera.worker_alive else "stopped") }}
+                ({{ camera.restarts }} restarts){% if camera.latency_avg_s is defined %}, latency {{ (camera.latency_avg_s * 1000) | round(1) }} ms avg{% endif %}</li>
+            {% endfor %}
+        </ul>
+        {% endif %}
+        {% if pipeline %}
+        <p>Frames: {{ pipeline.frames_processed }} analysed, {{ pipeline.frames_dropped }} dropped of {{ pipeline.frames_captured }} captured, latency {{ pipeline.latency_avg_ms }} ms avg / {{ pipeline.latency_max_ms }} ms max.</p>
+        {% endif %}
         {% if playlist_created %}
         <p>Playlist created and monitoring stopped.</p>
         {% endif %}
+        {% if playback_stats.last_time_to_audio_s is not none %}
+        <p>Playback started {{ playback_stats.last_time_to_audio_s }} s after the playlist was ready.</p>
+        {% endif %}
         """,
         driver_state=state.driver_state,
         playlist_created=state.playlist_created,
+        monitoring_active=state.monitoring_active,
+        models=model_stats(),
+        pipeline=state.pipeline_stats.summary() if state.pipeline_stats else None,
+        multi_camera=multi_camera_mode(),
+        seat_states=dict(state.seat_states),
+        cameras=state.monitor_supervisor.stats() if state.monitor_supervisor else {},
+        playback_stats=playback.stats(),
     )
 
 
@@ -55,9 +96,23 @@ def callback():
         return _render_message_page("Spotify credentials are missing.")
     token_info = sp_oauth.get_access_token(request.args.get("code"))
     set_token_info(token_info)
+    spotify_client = get_spotify_client()
+    if spotify_client is not None:
+        warm_taste_profile(spotify_client)
     return redirect(url_for("home"))
 
 
+@app.route("/preview")
+def preview_stream():
+    if not preview.available:
+        return _render_message_page("OpenCV is required for the live preview."), 503
+    if multi_camera_mode():
+        return _render_message_page("The live preview is not available when MONITOR_CAMERAS is set."), 409
+    if not state.monitoring_active:
+        return _render_message_page("Monitoring is not running.")
+    return Response(preview.stream(), mimetype=f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+
+
 @app.route("/start", methods=["POST"])
 def start():
     if not spotify_auth_ready() or sp_oauth is None:
@@ -78,17 +133,20 @@ def start():
 @app.route("/stop", methods=["POST"])
 def stop():
     spotify_client = get_spotify_client()
+    state.stop_event.set()
     if state.monitoring_active:
         state.monitoring_active = False
-        state.stop_event.set()
         if state.monitoring_thread:
             state.monitoring_thread.join(timeout=5)
             state.monitoring_thread = None
+    if not playlist_updates.wait(timeout=PLAYLIST_STOP_TIMEOUT_SECONDS):
+        print("A playlist update is still running; it will discard its playlist when it finishes.")
     if state.created_playlist_id and spotify_client:
         try:
             spotify_client.current_user_unfollow_playlist(state.created_playlist_id)
         except Exception as error:
             print(f"Error deleting playlist: {error}")
         state.created_playlist_id = None
+        state.playlist_uris = []
     state.playlist_created = False
     return redirect(url_for("home"))